@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import types
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _install_stubs() -> None:
+    # Stand-ins for the Windows-only drivers so the agent's own code can be timed on any OS.
+    class _Target:
+        def __init__(self) -> None:
+            self.gain = 0.0
+            self.mute = False
+
+        def apply(self, data: Dict[str, Any]) -> None:
+            for key, value in data.items():
+                setattr(self, key, value)
+
+    class _Remote:
+        def __init__(self) -> None:
+            self.strip = [_Target() for _ in range(8)]
+            self.bus = [_Target() for _ in range(8)]
+            self.params: Dict[str, Any] = {}
+            self.pdirty = False
+            self.kind = types.SimpleNamespace(num_strip_levels=34, num_bus_levels=40)
+
+        def login(self) -> None:
+            pass
+
+        def logout(self) -> None:
+            pass
+
+        def get(self, param: str, is_string: bool = False) -> Any:
+            return self.params.get(param, "" if is_string else 0.0)
+
+        def set(self, param: str, value: Any) -> None:
+            self.params[param] = value
+
+        def apply(self, data: Dict[str, Dict[str, Any]]) -> None:
+            for key, fields in data.items():
+                kind, idx = key.split("-")
+                getattr(self, kind)[int(idx)].apply(fields)
+
+    class _Key:
+        def __getattr__(self, name: str) -> str:
+            return f"Key.{name}"
+
+    class _Controller:
+        def press(self, key: Any) -> None:
+            pass
+
+        def release(self, key: Any) -> None:
+            pass
+
+    voicemeeterlib = types.ModuleType("voicemeeterlib")
+    voicemeeterlib.api = lambda kind, **kwargs: _Remote()
+    pynput = types.ModuleType("pynput")
+    keyboard = types.ModuleType("pynput.keyboard")
+    keyboard.Controller = _Controller
+    keyboard.Key = _Key()
+    pynput.keyboard = keyboard
+    sys.modules["voicemeeterlib"] = voicemeeterlib
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.keyboard"] = keyboard
+
+
+_install_stubs()
+warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from server import actions, admission, allowlist, executor, main, voicemeeter, wire  # noqa: E402
+from server.config import VERSION, VOICEMEETER_ALLOWED_BUSES, VOICEMEETER_ALLOWED_STRIPS  # noqa: E402
+from server.keypress import validate_keys  # noqa: E402
+from server.logging_conf import JsonLineFormatter  # noqa: E402
+from server.models import CommandBase, CommandResponse  # noqa: E402
+
+# Every stage runs as one caller at full speed; lift the token buckets so nothing is throttled.
+admission.ADMISSION_RATE_LIMITS = {name: (1e12, 1 << 30) for name in admission.ADMISSION_RATE_LIMITS}
+
+
+def _apply_settings() -> Dict[str, Dict[str, Any]]:
+    settings: Dict[str, Dict[str, Any]] = {}
+    for idx in sorted(VOICEMEETER_ALLOWED_STRIPS):
+        settings[f"strip-{idx}"] = {"gain": -6.0, "mute": False}
+    for idx in sorted(VOICEMEETER_ALLOWED_BUSES):
+        settings[f"bus-{idx}"] = {"gain": 0.0, "mute": True}
+    return settings
+
+
+def _nested_fields(width: int, depth: int) -> Dict[str, Any]:
+    if depth == 0:
+        return {f"field{idx}": float(idx) for idx in range(width)}
+    return {f"group{idx}": _nested_fields(width, depth - 1) for idx in range(width)}
+
+
+def _apply_body() -> bytes:
+    return json.dumps(
+        {"request_id": "bench-1", "action": "voicemeeter_apply", "payload": {"settings": _apply_settings()}}
+    ).encode("utf-8")
+
+
+def _log_record() -> logging.LogRecord:
+    record = logging.LogRecord("agent", logging.INFO, __file__, 0, "command_ok", None, None)
+    record.extra = {
+        "request_id": "bench-1",
+        "action": "voicemeeter_apply",
+        "ok": True,
+        "error": None,
+        "caller_ip": "127.0.0.1",
+    }
+    return record
+
+
+def _execute_many(req: CommandBase, count: int, execute: Callable[..., Any] = main._execute_command) -> None:
+    async def run() -> None:
+        for _ in range(count):
+            await execute(req, "127.0.0.1")
+
+    asyncio.run(run())
+
+
+def _run_action(action: str, payload: Any) -> Dict[str, Any]:
+    # Validate + handler, as a lane worker runs them, without the HTTP and queueing layers.
+    spec = actions.ACTIONS[action]
+    if spec.validate is not None:
+        spec.validate(payload)
+    return spec.handler(payload)
+
+
+def _stages() -> Dict[str, Callable[[], Any]]:
+    body = _apply_body()
+    apply_payload = actions.parse_command(body).payload
+    settings = _apply_settings()
+    get_payload = actions.parse_command(
+        {
+            "request_id": "bench-2",
+            "action": "voicemeeter_get",
+            "payload": {"targets": sorted(settings), "fields": ["gain", "mute"], "live": True},
+        }
+    ).payload
+    key_payload = actions.parse_command(
+        {"request_id": "bench-3", "action": "key_press", "payload": {"keys": ["ctrl", "shift", "m"]}}
+    ).payload
+    nested = _nested_fields(8, 2)
+    formatter = JsonLineFormatter()
+    record = _log_record()
+    result = _run_action("voicemeeter_get", get_payload)
+    response = CommandResponse(request_id="bench-2", ok=True, result=result)
+    args = [f"--arg{idx}=value" for idx in range(16)]
+
+    stages = {
+        "parse.command_request": lambda: actions.parse_command(body),
+        "validate.voicemeeter_settings": lambda: voicemeeter._validate_settings(settings),
+        "validate.executor_args": lambda: executor._validate_args(allowlist.INDEX, "notepad", args),
+        "validate.keys": lambda: validate_keys(["ctrl", "shift", "m"]),
+        "admission.admit": lambda: admission.admit("127.0.0.1", "voicemeeter_apply"),
+        "flatten.fields_512": lambda: voicemeeter._flatten_fields(nested),
+        "dispatch.voicemeeter_apply": lambda: _run_action("voicemeeter_apply", apply_payload),
+        "dispatch.voicemeeter_get_live": lambda: _run_action("voicemeeter_get", get_payload),
+        "dispatch.key_press": lambda: _run_action("key_press", key_payload),
+        "format.json_log_line": lambda: formatter.format(record),
+        "serialize.command_response": lambda: wire.encode(wire.JSON, response).body,
+        "serialize.command_response_dict": lambda: JSONResponse(response.dict()).body,
+    }
+    # Binary codecs are optional dependencies; time them only when installed.
+    request = json.loads(body)
+    for codec in wire.available():
+        if codec == wire.JSON:
+            continue
+        module = wire._LOADED[codec]
+        packed = module.packb(request) if codec == "msgpack" else module.dumps(request)
+        stages[f"parse.command_request_{codec}"] = lambda c=codec, p=packed: actions.parse_command(wire.decode(c, p))
+        stages[f"serialize.command_response_{codec}"] = lambda c=codec: wire.encode(c, response).body
+    return stages
+
+
+def _time_stage(fn: Callable[[], Any], iterations: int, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        samples.append((time.perf_counter() - started) / iterations * 1e9)
+    return samples
+
+
+def _summary(samples: List[float], iterations: int) -> Dict[str, Any]:
+    return {
+        "ns_per_op": round(min(samples), 1),
+        "median_ns_per_op": round(statistics.median(samples), 1),
+        "iterations": iterations,
+        "repeat": len(samples),
+    }
+
+
+def run(iterations: int, repeat: int, only: List[str] | None) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for name, fn in _stages().items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        fn()
+        results[name] = _summary(_time_stage(fn, iterations, repeat), iterations)
+
+    if not only or any("dispatch.execute".startswith(prefix) for prefix in only):
+        req = actions.parse_command(_apply_body())
+        count = max(1, iterations // 10)
+        _execute_many(req, 1)
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _execute_many(req, count)
+            samples.append((time.perf_counter() - started) / count * 1e9)
+        results["dispatch.execute_via_lane"] = _summary(samples, count)
+
+    if not only or any("dispatch.execute_replay_hit".startswith(prefix) for prefix in only):
+        # Same request_id every time: everything after the first call is served from the replay cache.
+        req = actions.parse_command(_apply_body())
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            _execute_many(req, iterations, main._execute)
+            samples.append((time.perf_counter() - started) / iterations * 1e9)
+        results["dispatch.execute_replay_hit"] = _summary(samples, iterations)
+
+    return {
+        "suite": "hot_path",
+        "agent_version": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp_utc": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions = []
+    for name, stats in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"{name:34s} {stats['ns_per_op']:12.1f} ns   (new)")
+            continue
+        ratio = stats["ns_per_op"] / base["ns_per_op"] if base["ns_per_op"] else 1.0
+        flag = ""
+        if ratio > 1.0 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:34s} {stats['ns_per_op']:12.1f} ns   {base['ns_per_op']:12.1f} ns   {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description="Time each stage of the /command hot path with stubbed drivers.")
+    parser.add_argument("--iterations", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", action="append", help="run only stages whose name starts with this prefix")
+    parser.add_argument("--output", type=Path, default=Path("bench-hot-path.json"))
+    parser.add_argument("--compare", type=Path, help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    report = run(args.iterations, args.repeat, args.only)
+    args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        print(f"wrote {args.output}")
+        if regressions:
+            sys.exit(1)
+        return
+
+    for name, stats in report["results"].items():
+        print(f"{name:34s} {stats['ns_per_op']:12.1f} ns/op")
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from server import voicemeeter  # noqa: E402
+from server.config import (  # noqa: E402
+    VOICEMEETER_ALLOWED_BUSES,
+    VOICEMEETER_ALLOWED_FIELD_PATTERNS,
+    VOICEMEETER_ALLOWED_STRIPS,
+    VOICEMEETER_ALLOWED_TARGET_PATTERNS,
+)
+
+
+def _legacy_matches_any(value: str, patterns: Iterable[str]) -> bool:
+    return any(re.fullmatch(pattern, value) for pattern in patterns)
+
+
+def _legacy_validate_settings(settings: Dict[str, Dict[str, Any]]) -> None:
+    for target, fields in settings.items():
+        if not _legacy_matches_any(target, VOICEMEETER_ALLOWED_TARGET_PATTERNS):
+            raise ValueError(f"Target not allowed: {target}")
+        strip_match = re.fullmatch(r"strip-(\d+)", target)
+        bus_match = re.fullmatch(r"bus-(\d+)", target)
+        if strip_match and int(strip_match.group(1)) not in VOICEMEETER_ALLOWED_STRIPS:
+            raise ValueError(f"Strip not allowed: {target}")
+        if bus_match and int(bus_match.group(1)) not in VOICEMEETER_ALLOWED_BUSES:
+            raise ValueError(f"Bus not allowed: {target}")
+        flat_fields = voicemeeter._flatten_fields(fields)
+        for path, value in flat_fields.items():
+            if not _legacy_matches_any(path, VOICEMEETER_ALLOWED_FIELD_PATTERNS):
+                raise ValueError(f"Field not allowed: {path}")
+            if path == "gain":
+                voicemeeter._validate_gain_value(value)
+            elif path == "mute":
+                voicemeeter._validate_mute_value(value)
+
+
+def _large_settings() -> Dict[str, Dict[str, Any]]:
+    settings: Dict[str, Dict[str, Any]] = {}
+    for idx in sorted(VOICEMEETER_ALLOWED_STRIPS):
+        settings[f"strip-{idx}"] = {"gain": -6.0, "mute": False}
+    for idx in sorted(VOICEMEETER_ALLOWED_BUSES):
+        settings[f"bus-{idx}"] = {"gain": 0.0, "mute": True}
+    return settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare legacy and indexed voicemeeter_apply validation.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    settings = _large_settings()
+    legacy = min(timeit.repeat(lambda: _legacy_validate_settings(settings), number=args.iterations, repeat=3))
+    indexed = min(timeit.repeat(lambda: voicemeeter._validate_settings(settings), number=args.iterations, repeat=3))
+
+    legacy_us = legacy / args.iterations * 1e6
+    indexed_us = indexed / args.iterations * 1e6
+    print(f"payload: {len(settings)} targets x 2 fields, {args.iterations} iterations")
+    print(f"legacy  re.fullmatch: {legacy_us:8.2f} us/payload")
+    print(f"indexed validation:   {indexed_us:8.2f} us/payload")
+    print(f"speedup:              {legacy / indexed:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,4 +21,4 @@ if "%AGENT_TOKEN%"=="" (
   exit /b 1
 )
 
-".venv\Scripts\python.exe" -m uvicorn server.main:app --host 0.0.0.0 --port 8765
+".venv\Scripts\python.exe" -m uvicorn server.main:app --host 0.0.0.0 --port 8765 --timeout-graceful-shutdown 2
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Annotated, Any, Awaitable, Callable, Dict, List, Literal, Tuple, Type, Union
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, create_model
+
+from . import executor, ramps, snapshots, voicemeeter
+from .keypress import send_key_sequence, send_keys, validate_key_sequence, validate_keys
+from .models import (
+    CommandBase,
+    KeyPressPayload,
+    KeySequencePayload,
+    ProcessStatusPayload,
+    RunAppPayload,
+    VoicemeeterApplyPayload,
+    VoicemeeterCommandPayload,
+    VoicemeeterGetPayload,
+    VoicemeeterGroupBusGainPayload,
+    VoicemeeterRampPayload,
+    VoicemeeterSetPayload,
+    VoicemeeterSnapshotPayload,
+)
+
+_Settings = Dict[str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ActionSpec:
+    name: str
+    payload_model: Type[BaseModel]
+    handler: Callable[[Any], Dict[str, Any]]
+    lane: str = "voicemeeter"
+    # Runs before the command is queued, so rejected requests never wait for a lane.
+    validate: Callable[[Any], Any] | None = None
+    # Settings writes that a batch may merge into one vm.apply: payload -> (settings, result).
+    prepare_write: Callable[[Any], Tuple[_Settings, Dict[str, Any]]] | None = None
+    # Payloads with "coalesce" set run this on the event loop instead of the lane handler.
+    coalesced: Callable[[Any], Awaitable[Dict[str, Any]]] | None = None
+
+
+ACTIONS: Dict[str, ActionSpec] = {}
+
+
+def register(
+    name: str,
+    payload_model: Type[BaseModel],
+    lane: str = "voicemeeter",
+    validate: Callable[[Any], Any] | None = None,
+    prepare_write: Callable[[Any], Tuple[_Settings, Dict[str, Any]]] | None = None,
+    coalesced: Callable[[Any], Awaitable[Dict[str, Any]]] | None = None,
+) -> Callable[[Callable[[Any], Dict[str, Any]]], Callable[[Any], Dict[str, Any]]]:
+    def decorator(handler: Callable[[Any], Dict[str, Any]]) -> Callable[[Any], Dict[str, Any]]:
+        ACTIONS[name] = ActionSpec(name, payload_model, handler, lane, validate, prepare_write, coalesced)
+        return handler
+
+    return decorator
+
+
+@register("run_app", RunAppPayload, lane="process")
+def _run_app(payload: RunAppPayload) -> Dict[str, Any]:
+    return executor.launch(payload.app, payload.args)
+
+
+@register("process_status", ProcessStatusPayload, lane="process")
+def _process_status(payload: ProcessStatusPayload) -> Dict[str, Any]:
+    return executor.process_status(payload.app, payload.running_only)
+
+
+@register("key_press", KeyPressPayload, lane="keyboard", validate=lambda p: validate_keys(p.keys))
+def _key_press(payload: KeyPressPayload) -> Dict[str, Any]:
+    send_keys(payload.keys)
+    return {"sent": payload.keys}
+
+
+def _chords(payload: KeySequencePayload) -> Tuple[List[List[str]], List[int]]:
+    chords = [chord.keys for chord in payload.chords]
+    delays = [payload.delay_ms if chord.delay_ms is None else chord.delay_ms for chord in payload.chords]
+    return chords, delays
+
+
+@register(
+    "key_sequence",
+    KeySequencePayload,
+    lane="keyboard",
+    validate=lambda p: validate_key_sequence(*_chords(p)),
+)
+def _key_sequence(payload: KeySequencePayload) -> Dict[str, Any]:
+    return {"chords": send_key_sequence(*_chords(payload))}
+
+
+def _prepare_apply(payload: VoicemeeterApplyPayload) -> Tuple[_Settings, Dict[str, Any]]:
+    settings = voicemeeter.prepare_settings(payload.settings)
+    return settings, {"applied": len(settings)}
+
+
+async def _voicemeeter_apply_coalesced(payload: VoicemeeterApplyPayload) -> Dict[str, Any]:
+    return await voicemeeter.queue_settings(payload.settings, payload.coalesce)
+
+
+@register(
+    "voicemeeter_apply",
+    VoicemeeterApplyPayload,
+    validate=lambda p: voicemeeter.prepare_settings(p.settings),
+    prepare_write=_prepare_apply,
+    coalesced=_voicemeeter_apply_coalesced,
+)
+def _voicemeeter_apply(payload: VoicemeeterApplyPayload) -> Dict[str, Any]:
+    voicemeeter.apply_prepared_settings([payload.settings])
+    return {"applied": len(payload.settings)}
+
+
+def _prepare_group_bus_gain(payload: VoicemeeterGroupBusGainPayload) -> Tuple[_Settings, Dict[str, Any]]:
+    return voicemeeter.prepare_group_bus_gain(payload.gain)
+
+
+@register(
+    "voicemeeter_group_bus_gain",
+    VoicemeeterGroupBusGainPayload,
+    validate=_prepare_group_bus_gain,
+    prepare_write=_prepare_group_bus_gain,
+)
+def _voicemeeter_group_bus_gain(payload: VoicemeeterGroupBusGainPayload) -> Dict[str, Any]:
+    return voicemeeter.apply_group_bus_gain(payload.gain)
+
+
+@register("voicemeeter_command", VoicemeeterCommandPayload)
+def _voicemeeter_command(payload: VoicemeeterCommandPayload) -> Dict[str, Any]:
+    voicemeeter.run_command(payload.command)
+    return {"command": payload.command}
+
+
+def _validate_get(payload: VoicemeeterGetPayload) -> None:
+    if payload.params is not None:
+        voicemeeter.validate_params([param.dict() for param in payload.params])
+    else:
+        voicemeeter.validate_targets_fields(payload.targets or [], payload.fields or [])
+
+
+@register("voicemeeter_get", VoicemeeterGetPayload, validate=_validate_get)
+def _voicemeeter_get(payload: VoicemeeterGetPayload) -> Dict[str, Any]:
+    if payload.params is not None:
+        params = [param.dict() for param in payload.params]
+        values, age_ms = voicemeeter.get_params(params, live=bool(payload.live))
+    else:
+        targets = payload.targets or []
+        fields = payload.fields or []
+        values, age_ms = voicemeeter.get_targets_fields(targets, fields, live=bool(payload.live))
+    return {"values": values, "source": "live" if age_ms is None else "mirror", "age_ms": age_ms}
+
+
+async def _voicemeeter_set_coalesced(payload: VoicemeeterSetPayload) -> Dict[str, Any]:
+    return await voicemeeter.queue_params([param.dict() for param in payload.params], payload.coalesce)
+
+
+@register(
+    "voicemeeter_set",
+    VoicemeeterSetPayload,
+    validate=lambda p: voicemeeter.validate_params([param.dict() for param in p.params]),
+    coalesced=_voicemeeter_set_coalesced,
+)
+def _voicemeeter_set(payload: VoicemeeterSetPayload) -> Dict[str, Any]:
+    params = [param.dict() for param in payload.params]
+    return {"applied": voicemeeter.set_params(params)}
+
+
+@register(
+    "voicemeeter_ramp",
+    VoicemeeterRampPayload,
+    validate=lambda p: ramps.validate_ramp(p.targets, p.gain, p.duration_ms, p.curve),
+)
+def _voicemeeter_ramp(payload: VoicemeeterRampPayload) -> Dict[str, Any]:
+    return ramps.start_ramp(payload.targets, payload.gain, payload.duration_ms, payload.curve)
+
+
+@register("voicemeeter_snapshot_save", VoicemeeterSnapshotPayload, validate=lambda p: snapshots.validate_name(p.name))
+def _voicemeeter_snapshot_save(payload: VoicemeeterSnapshotPayload) -> Dict[str, Any]:
+    return snapshots.save(payload.name)
+
+
+@register(
+    "voicemeeter_snapshot_restore",
+    VoicemeeterSnapshotPayload,
+    validate=lambda p: snapshots.validate_restore(p.name),
+)
+def _voicemeeter_snapshot_restore(payload: VoicemeeterSnapshotPayload) -> Dict[str, Any]:
+    return snapshots.restore(payload.name)
+
+
+def _command_model(spec: ActionSpec) -> Type[CommandBase]:
+    title = "".join(part.title() for part in spec.name.split("_")) + "Command"
+    return create_model(
+        title,
+        __base__=CommandBase,
+        action=(Literal[spec.name], ...),
+        payload=(spec.payload_model, ...),
+    )
+
+
+COMMAND_MODELS: Dict[str, Type[CommandBase]] = {name: _command_model(spec) for name, spec in ACTIONS.items()}
+# One validation pass: the "action" tag picks the model, which validates the payload in place.
+CommandRequest = Annotated[Union[tuple(COMMAND_MODELS.values())], Field(discriminator="action")]
+_COMMAND_ADAPTER: TypeAdapter[Any] = TypeAdapter(CommandRequest, config=ConfigDict(title="CommandRequest"))
+
+
+class PayloadError(ValueError):
+    # The envelope was valid but the payload was not; reported like a failed command.
+    def __init__(self, request_id: str, action: str, message: str) -> None:
+        super().__init__(message)
+        self.request_id = request_id
+        self.action = action
+
+
+def _payload_error(exc: ValidationError, data: Any) -> PayloadError | None:
+    errors = exc.errors()
+    if not errors or not isinstance(data, dict):
+        return None
+    for error in errors:
+        loc = error["loc"]
+        if len(loc) < 2 or loc[1] != "payload":
+            return None
+    details = "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'][2:]) or 'payload'}: {error['msg']}" for error in errors
+    )
+    return PayloadError(data["request_id"], data["action"], f"Invalid payload: {details}")
+
+
+def parse_command(raw: Any) -> CommandBase:
+    # str/bytes are JSON text; anything else is already decoded (dict from a JSON batch, msgpack or CBOR).
+    is_text = isinstance(raw, (str, bytes))
+    try:
+        if is_text:
+            return _COMMAND_ADAPTER.validate_json(raw)
+        return _COMMAND_ADAPTER.validate_python(raw)
+    except ValidationError as exc:
+        data = raw
+        if is_text:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                raise exc from None
+        payload_error = _payload_error(exc, data)
+        if payload_error is not None:
+            raise payload_error from None
+        raise
+
+
+def validate(req: CommandBase) -> ActionSpec:
+    spec = ACTIONS[req.action]
+    if spec.validate is not None:
+        spec.validate(req.payload)
+    return spec
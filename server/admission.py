@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from . import metrics
+from .config import (
+    ADMISSION_ACTION_PRIORITY,
+    ADMISSION_LOG_INTERVAL_SECONDS,
+    ADMISSION_MAX_CALLERS,
+    ADMISSION_PRIORITIES,
+    ADMISSION_QUEUE_DEADLINE_MS,
+    ADMISSION_RATE_LIMITS,
+)
+
+DEFAULT_CLASS = "normal"
+REASONS = ("rate", "deadline")
+
+
+class RateLimitedError(RuntimeError):
+    pass
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+_RANKS: Dict[str, int] = {name: rank for rank, name in enumerate(ADMISSION_PRIORITIES)}
+_MAX_WAIT: Dict[str, float] = {name: ms / 1000.0 for name, ms in ADMISSION_QUEUE_DEADLINE_MS.items()}
+
+# Only touched from the event loop thread, so no lock is needed.
+_BUCKETS: "OrderedDict[Tuple[str, str], _Bucket]" = OrderedDict()
+# (caller, class, reason) -> [rejections not yet logged, monotonic time of the last log line]
+_REJECTIONS: Dict[Tuple[str, str, str], List[float]] = {}
+
+
+def priority_class(action: str) -> str:
+    return ADMISSION_ACTION_PRIORITY.get(action, DEFAULT_CLASS)
+
+
+def admit(caller: str, action: str) -> Tuple[int, float]:
+    # Returns (lane priority, max queue wait in seconds) or raises RateLimitedError.
+    klass = priority_class(action)
+    rate, burst = ADMISSION_RATE_LIMITS[klass]
+    key = (caller, klass)
+    now = time.monotonic()
+    bucket = _BUCKETS.get(key)
+    if bucket is None:
+        bucket = _BUCKETS[key] = _Bucket(float(burst), now)
+        if len(_BUCKETS) > ADMISSION_MAX_CALLERS * len(_RANKS):
+            _BUCKETS.popitem(last=False)
+    else:
+        _BUCKETS.move_to_end(key)
+        bucket.tokens = min(float(burst), bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+    if bucket.tokens < 1.0:
+        reject(caller, action, "rate")
+        retry_in = (1.0 - bucket.tokens) / rate
+        raise RateLimitedError(f"Too many {klass} commands ({rate:g}/s, burst {burst}); retry in {retry_in:.2f}s")
+    bucket.tokens -= 1.0
+    return _RANKS[klass], _MAX_WAIT[klass]
+
+
+def _log_rejections(key: Tuple[str, str, str], count: int, action: str | None) -> None:
+    caller, klass, reason = key
+    logging.getLogger("agent").warning(
+        "admission_rejected",
+        extra={
+            "extra": {
+                "event": "admission_rejected",
+                "caller_ip": caller,
+                "class": klass,
+                "reason": reason,
+                "action": action,
+                "count": count,
+            }
+        },
+    )
+
+
+def reject(caller: str, action: str, reason: str) -> None:
+    # Counted per rejection, logged as one summary line per interval so a flood does not flood the log too.
+    klass = priority_class(action)
+    metrics.ADMISSION_REJECTED.inc(klass, reason)
+    key = (caller, klass, reason)
+    now = time.monotonic()
+    entry = _REJECTIONS.get(key)
+    if entry is None:
+        if len(_REJECTIONS) >= ADMISSION_MAX_CALLERS * len(_RANKS) * len(REASONS):
+            flush()
+        entry = _REJECTIONS[key] = [0, float("-inf")]
+    entry[0] += 1
+    if now - entry[1] >= ADMISSION_LOG_INTERVAL_SECONDS:
+        _log_rejections(key, int(entry[0]), action)
+        entry[0] = 0
+        entry[1] = now
+
+
+def flush() -> None:
+    for key, (count, _) in _REJECTIONS.items():
+        if count:
+            _log_rejections(key, int(count), None)
+    _REJECTIONS.clear()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "buckets": len(_BUCKETS),
+        "rejected": {
+            klass: {reason: int(metrics.ADMISSION_REJECTED.value(klass, reason)) for reason in REASONS}
+            for klass in ADMISSION_PRIORITIES
+        },
+    }
@@ -0,0 +1,350 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Annotated, Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Pattern, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from .config import (
+    ALLOWED_KEYS,
+    ALLOWLIST_CHECK_INTERVAL_SECONDS,
+    APPDATA_ALLOWLIST_PATH,
+    BASE_ALLOWLIST,
+    VOICEMEETER_ALLOWED_BUSES,
+    VOICEMEETER_ALLOWED_COMMANDS,
+    VOICEMEETER_ALLOWED_FIELD_PATTERNS,
+    VOICEMEETER_ALLOWED_PARAM_PATTERNS,
+    VOICEMEETER_ALLOWED_STRIPS,
+    VOICEMEETER_ALLOWED_TARGET_PATTERNS,
+    AppAllowlistEntry,
+)
+
+VERDICT_CACHE_SIZE = 4096
+
+_STRIP_BUS_RE = re.compile(r"(strip|bus)-(\d+)")
+
+
+class PatternSet:
+    def __init__(self, patterns: Iterable[str]) -> None:
+        patterns = list(patterns)
+        self.literals: FrozenSet[str] = frozenset(p for p in patterns if re.escape(p) == p)
+        compiled = [re.compile(p) for p in patterns if p not in self.literals]
+        # Groups would be renumbered and global inline flags rejected inside one alternation,
+        # so only plain patterns are combined; the rest are matched one by one.
+        plain = [c.pattern for c in compiled if not c.groups and c.flags == re.UNICODE]
+        self.regex: Pattern[str] | None = re.compile("|".join(f"(?:{p})" for p in plain)) if plain else None
+        self.separate: List[Pattern[str]] = [c for c in compiled if c.groups or c.flags != re.UNICODE]
+        self.empty = not patterns
+
+    def matches(self, value: str) -> bool:
+        if value in self.literals:
+            return True
+        if self.regex is not None and self.regex.fullmatch(value) is not None:
+            return True
+        return any(regex.fullmatch(value) is not None for regex in self.separate)
+
+
+class _VerdictCache:
+    def __init__(self, compute: Callable[[str], str | None]) -> None:
+        self._compute = compute
+        self._verdicts: Dict[str, str | None] = {}
+
+    def error_for(self, value: str) -> str | None:
+        try:
+            return self._verdicts[value]
+        except KeyError:
+            pass
+        verdict = self._compute(value)
+        if len(self._verdicts) >= VERDICT_CACHE_SIZE:
+            self._verdicts.clear()
+        self._verdicts[value] = verdict
+        return verdict
+
+
+def parse_strip_bus(target: str) -> Tuple[str, int] | None:
+    match = _STRIP_BUS_RE.fullmatch(target)
+    if not match:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+class AllowlistIndex:
+    def __init__(
+        self,
+        apps: Dict[str, AppAllowlistEntry],
+        target_patterns: List[str],
+        field_patterns: List[str],
+        param_patterns: List[str],
+        strips: Iterable[int],
+        buses: Iterable[int],
+        keys: Iterable[str] = ALLOWED_KEYS,
+        commands: Iterable[str] = VOICEMEETER_ALLOWED_COMMANDS,
+    ) -> None:
+        self.apps = dict(apps)
+        self.strips: FrozenSet[int] = frozenset(strips)
+        self.buses: FrozenSet[int] = frozenset(buses)
+        self.keys: FrozenSet[str] = frozenset(keys)
+        self.commands: FrozenSet[str] = frozenset(commands)
+        self.targets = PatternSet(target_patterns)
+        self.fields = PatternSet(field_patterns)
+        self.params = PatternSet(param_patterns)
+        self.app_args = {name: PatternSet(entry.allowed_args_patterns) for name, entry in self.apps.items()}
+        self.parsed_targets: Dict[str, Tuple[str, int]] = {}
+        self.target_verdicts: Dict[str, str | None] = {}
+        for idx in self.strips:
+            self._index_target(f"strip-{idx}")
+        for idx in self.buses:
+            self._index_target(f"bus-{idx}")
+        self._target_cache = _VerdictCache(self._compute_target_error)
+        self._field_cache = _VerdictCache(self._compute_field_error)
+        self._param_cache = _VerdictCache(self._compute_param_error)
+        self._arg_caches = {
+            name: _VerdictCache(lambda arg, pats=pats: None if pats.matches(arg) else f"Argument not allowed: {arg}")
+            for name, pats in self.app_args.items()
+        }
+
+    def _index_target(self, target: str) -> None:
+        parsed = parse_strip_bus(target)
+        if parsed:
+            self.parsed_targets[target] = parsed
+        self.target_verdicts[target] = self._compute_target_error(target)
+
+    def _compute_target_error(self, target: str) -> str | None:
+        if not self.targets.matches(target):
+            return f"Target not allowed: {target}"
+        parsed = parse_strip_bus(target)
+        if not parsed:
+            return None
+        kind, idx = parsed
+        if kind == "strip" and idx not in self.strips:
+            return f"Strip not allowed: {target}"
+        if kind == "bus" and idx not in self.buses:
+            return f"Bus not allowed: {target}"
+        return None
+
+    def _compute_field_error(self, path: str) -> str | None:
+        return None if self.fields.matches(path) else f"Field not allowed: {path}"
+
+    def _compute_param_error(self, param: str) -> str | None:
+        if self.params.empty:
+            return "Raw parameter access is disabled"
+        return None if self.params.matches(param) else f"Param not allowed: {param}"
+
+    def target_error(self, target: str) -> str | None:
+        try:
+            return self.target_verdicts[target]
+        except KeyError:
+            return self._target_cache.error_for(target)
+
+    def field_error(self, path: str) -> str | None:
+        return self._field_cache.error_for(path)
+
+    def param_error(self, param: str) -> str | None:
+        return self._param_cache.error_for(param)
+
+    def arg_error(self, app_name: str, arg: str) -> str | None:
+        cache = self._arg_caches.get(app_name)
+        if cache is None:
+            return "Unknown app"
+        return cache.error_for(arg)
+
+    def parse_target(self, target: str) -> Tuple[str, int] | None:
+        parsed = self.parsed_targets.get(target)
+        if parsed is not None:
+            return parsed
+        return parse_strip_bus(target)
+
+
+class _AppFile(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    path: str
+    allowed_args_patterns: List[str] = []
+    max_instances: Optional[int] = Field(default=None, ge=1)
+
+
+# Potato has 8 strips and 8 buses.
+_ChannelIndex = Annotated[int, Field(ge=0, le=7)]
+
+
+class _VoicemeeterFile(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    strips: Optional[List[_ChannelIndex]] = None
+    buses: Optional[List[_ChannelIndex]] = None
+    target_patterns: Optional[List[str]] = None
+    field_patterns: Optional[List[str]] = None
+    param_patterns: Optional[List[str]] = None
+    commands: Optional[List[str]] = None
+
+
+class AllowlistFile(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    apps: Optional[Dict[str, _AppFile]] = None
+    keys: Optional[List[str]] = None
+    voicemeeter: Optional[_VoicemeeterFile] = None
+
+
+def build_index(config: AllowlistFile | None = None) -> AllowlistIndex:
+    # Sections missing from the file keep the defaults from config.py.
+    config = config or AllowlistFile()
+    vm = config.voicemeeter or _VoicemeeterFile()
+    apps = BASE_ALLOWLIST
+    if config.apps is not None:
+        apps = {
+            name: AppAllowlistEntry(name, Path(app.path), list(app.allowed_args_patterns), app.max_instances)
+            for name, app in config.apps.items()
+        }
+    return AllowlistIndex(
+        apps=apps,
+        target_patterns=VOICEMEETER_ALLOWED_TARGET_PATTERNS if vm.target_patterns is None else vm.target_patterns,
+        field_patterns=VOICEMEETER_ALLOWED_FIELD_PATTERNS if vm.field_patterns is None else vm.field_patterns,
+        param_patterns=VOICEMEETER_ALLOWED_PARAM_PATTERNS if vm.param_patterns is None else vm.param_patterns,
+        strips=VOICEMEETER_ALLOWED_STRIPS if vm.strips is None else vm.strips,
+        buses=VOICEMEETER_ALLOWED_BUSES if vm.buses is None else vm.buses,
+        keys=ALLOWED_KEYS if config.keys is None else [key.lower() for key in config.keys],
+        commands=VOICEMEETER_ALLOWED_COMMANDS if vm.commands is None else vm.commands,
+    )
+
+
+def _check_file(config: AllowlistFile) -> None:
+    from .keypress import KEY_NAMES
+
+    vm = config.voicemeeter or _VoicemeeterFile()
+    patterns = [*(vm.target_patterns or []), *(vm.field_patterns or []), *(vm.param_patterns or [])]
+    for name, app in (config.apps or {}).items():
+        if not Path(app.path).is_absolute():
+            raise ValueError(f"apps.{name}.path must be absolute")
+        patterns.extend(app.allowed_args_patterns)
+    for pattern in patterns:
+        re.compile(pattern)
+    for key in config.keys or []:
+        if len(key) != 1 and key.lower() not in KEY_NAMES:
+            raise ValueError(f"Unknown key: {key}")
+    for command in vm.commands or []:
+        if command not in VOICEMEETER_ALLOWED_COMMANDS:
+            raise ValueError(f"Unsupported Voicemeeter command: {command}")
+
+
+def load_file(path: Path) -> AllowlistIndex:
+    config = AllowlistFile.model_validate_json(path.read_bytes())
+    _check_file(config)
+    return build_index(config)
+
+
+INDEX = build_index()
+
+_RELOAD_LOCK = threading.Lock()
+# (mtime_ns, size) of the last file looked at, valid or not; None = no file, built-in defaults.
+_FILE_KEY: Tuple[int, int] | None = None
+_STATE: Dict[str, Any] = {"source": "defaults", "loaded_at": None, "reloads": 0, "error": None}
+_WATCH_STOP = threading.Event()
+_WATCH_THREAD: threading.Thread | None = None
+
+
+def _file_key(path: Path) -> Tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _describe(exc: Exception) -> str:
+    if isinstance(exc, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in error['loc']) or 'file'}: {error['msg']}" for error in exc.errors()
+        )
+    if isinstance(exc, re.error):
+        return f"Invalid pattern {exc.pattern!r}: {exc}"
+    return str(exc)
+
+
+def reload_if_changed(path: Path = APPDATA_ALLOWLIST_PATH) -> bool:
+    # Built off the request path and swapped in with one assignment: a request that already
+    # holds the old INDEX keeps using it, new requests see the new one.
+    global INDEX, _FILE_KEY
+    with _RELOAD_LOCK:
+        try:
+            key = _file_key(path)
+        except OSError:
+            return False
+        if key == _FILE_KEY:
+            return False
+        _FILE_KEY = key
+        logger = logging.getLogger("agent")
+        started = time.perf_counter()
+        try:
+            index = load_file(path) if key is not None else build_index()
+        except FileNotFoundError:
+            _FILE_KEY = None
+            index = build_index()
+        except (OSError, ValueError, re.error) as exc:
+            error = _describe(exc)
+            _STATE["error"] = error
+            logger.error(
+                "allowlist_invalid",
+                extra={"extra": {"event": "allowlist_invalid", "path": str(path), "error": error}},
+            )
+            return False
+        INDEX = index
+        _STATE.update(
+            source=str(path) if _FILE_KEY is not None else "defaults",
+            loaded_at=time.time(),
+            reloads=_STATE["reloads"] + 1,
+            error=None,
+        )
+        logger.info(
+            "allowlist_loaded",
+            extra={
+                "extra": {
+                    "event": "allowlist_loaded",
+                    "source": _STATE["source"],
+                    "apps": len(index.apps),
+                    "keys": len(index.keys),
+                    "strips": len(index.strips),
+                    "buses": len(index.buses),
+                    "took_ms": round((time.perf_counter() - started) * 1000.0, 3),
+                }
+            },
+        )
+        return True
+
+
+def _watch() -> None:
+    while not _WATCH_STOP.wait(ALLOWLIST_CHECK_INTERVAL_SECONDS):
+        try:
+            reload_if_changed()
+        except Exception as exc:
+            logging.getLogger("agent").warning(
+                "allowlist_watch_error",
+                extra={"extra": {"event": "allowlist_watch_error", "error": str(exc)}},
+            )
+
+
+def start_watcher() -> None:
+    global _WATCH_THREAD
+    reload_if_changed()
+    if _WATCH_THREAD is not None and _WATCH_THREAD.is_alive():
+        return
+    _WATCH_STOP.clear()
+    _WATCH_THREAD = threading.Thread(target=_watch, name="allowlist-watcher", daemon=True)
+    _WATCH_THREAD.start()
+
+
+def stop_watcher() -> None:
+    global _WATCH_THREAD
+    _WATCH_STOP.set()
+    if _WATCH_THREAD is not None:
+        _WATCH_THREAD.join(timeout=2.0)
+    _WATCH_THREAD = None
+
+
+def state() -> Dict[str, Any]:
+    return dict(_STATE)
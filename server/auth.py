@@ -3,6 +3,8 @@ from __future__ import annotations
 import os
 from fastapi import Header, HTTPException
 
+from . import tracing
+
 
 def get_token_or_raise() -> str:
     token = os.environ.get("AGENT_TOKEN")
@@ -11,10 +13,15 @@ def get_token_or_raise() -> str:
     return token
 
 
-def verify_bearer(authorization: str | None = Header(default=None)) -> None:
+def check_bearer(authorization: str | None) -> None:
     token = get_token_or_raise()
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
     provided = authorization.split(" ", 1)[1].strip()
     if provided != token:
         raise HTTPException(status_code=403, detail="Invalid token")
+
+
+async def verify_bearer(authorization: str | None = Header(default=None)) -> None:
+    with tracing.span("auth"):
+        check_bearer(authorization)
@@ -11,6 +11,8 @@ class AppAllowlistEntry:
     name: str
     path: Path
     allowed_args_patterns: List[str]
+    # None = unlimited. At the limit, run_app returns the newest running instance instead of launching.
+    max_instances: int | None = None
 
 
 BASE_ALLOWLIST: Dict[str, AppAllowlistEntry] = {
@@ -91,11 +93,72 @@ ALLOWED_KEYS = {
     "9",
 }
 
+KEY_SEQUENCE_MAX_CHORDS = 32
+KEY_SEQUENCE_MAX_DELAY_MS = 2000
+
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 8765
 VERSION = "0.1.0"
+BATCH_MAX_COMMANDS = 100
+WS_MAX_INFLIGHT = 64
+# Responses are remembered per (caller IP, request_id) so client retries do not re-run actions.
+REPLAY_CACHE_SIZE = 1024
+REPLAY_CACHE_TTL_SECONDS = 300.0
+LANE_QUEUE_LIMITS = {
+    "voicemeeter": 256,
+    "keyboard": 32,
+    "process": 8,
+}
+LANE_WORKERS = {
+    "voicemeeter": 1,
+    "keyboard": 1,
+    "process": 2,
+}
+
+# Admission control, checked before a command is queued on its lane. Priority classes run
+# highest first within a lane; actions not listed are "normal".
+ADMISSION_PRIORITIES = ("interactive", "normal", "bulk")
+ADMISSION_ACTION_PRIORITY = {
+    "key_press": "interactive",
+    "key_sequence": "interactive",
+    "voicemeeter_command": "interactive",
+    "voicemeeter_apply": "bulk",
+    "voicemeeter_set": "bulk",
+    "voicemeeter_group_bus_gain": "bulk",
+}
+# Token bucket per caller IP and class: (tokens refilled per second, burst size).
+ADMISSION_RATE_LIMITS = {
+    "interactive": (20.0, 40),
+    "normal": (50.0, 100),
+    "bulk": (200.0, 400),
+}
+# Commands still queued after this long are rejected with 429 instead of running late.
+ADMISSION_QUEUE_DEADLINE_MS = {
+    "interactive": 500,
+    "normal": 2000,
+    "bulk": 250,
+}
+ADMISSION_MAX_CALLERS = 256
+# Rejections are summarised at most once per interval per caller, class and reason.
+ADMISSION_LOG_INTERVAL_SECONDS = 1.0
+
+PROCESS_TABLE_SIZE = 64
+PROCESS_REAP_INTERVAL_SECONDS = 0.5
+PROCESS_STAT_TTL_SECONDS = 2.0
+
+# /command and /commands report per-phase timings in a Server-Timing header; requests slower
+# than TRACE_SLOW_MS, plus a random TRACE_SAMPLE_RATE fraction, are also logged as "trace" lines.
+TRACE_SLOW_MS = 100.0
+TRACE_SAMPLE_RATE = 0.01
 
 APPDATA_LOG_DIR = Path(os.environ.get("APPDATA", r"C:\\")) / "IntegrateAgent" / "logs"
+LOG_QUEUE_SIZE = 10_000
+LOG_BATCH_MAX = 256
+# "drop" discards (and counts) records when the queue is full; "block" waits for the writer.
+LOG_OVERFLOW_POLICY = "drop"
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUP_COUNT = 5
+LOG_QUERY_MAX_LIMIT = 1000
 
 VOICEMEETER_KIND = "potato"
 VOICEMEETER_ALLOWED_STRIPS: Set[int] = set(range(0, 8))
@@ -116,4 +179,36 @@ VOICEMEETER_ALLOWED_PARAM_PATTERNS: List[str] = []
 VOICEMEETER_GAIN_MIN = -60.0
 VOICEMEETER_GAIN_MAX = 12.0
 VOICEMEETER_GROUP_BUS_IDS = [0, 1, 2]
+VOICEMEETER_RAMP_TICK_HZ = 50
+VOICEMEETER_RAMP_MAX_MS = 60_000
+VOICEMEETER_COALESCE_WINDOW_MS = 15
+VOICEMEETER_COALESCE_WAIT_SECONDS = 5.0
+
+VOICEMEETER_SUPERVISOR_INTERVAL_SECONDS = 1.0
+VOICEMEETER_SUPERVISOR_LOCK_TIMEOUT_SECONDS = 0.5
+VOICEMEETER_RECONNECT_BACKOFF_MIN_SECONDS = 0.5
+VOICEMEETER_RECONNECT_BACKOFF_MAX_SECONDS = 30.0
+
+APPDATA_SNAPSHOT_DIR = Path(os.environ.get("APPDATA", r"C:\\")) / "IntegrateAgent" / "snapshots"
+VOICEMEETER_SNAPSHOT_NAME_PATTERN = r"[A-Za-z0-9_-]{1,64}"
+VOICEMEETER_SNAPSHOT_MAX_COUNT = 100
+
+# Optional allowlist file; sections it leaves out keep the built-in defaults above. It is
+# re-read when its mtime or size changes and an invalid file keeps the previous allowlist.
+APPDATA_ALLOWLIST_PATH = Path(os.environ.get("APPDATA", r"C:\\")) / "IntegrateAgent" / "allowlist.json"
+ALLOWLIST_CHECK_INTERVAL_SECONDS = 2.0
+
+VOICEMEETER_MIRROR_ENABLED = True
+VOICEMEETER_MIRROR_POLL_SECONDS = 0.05
+VOICEMEETER_MIRROR_MAX_PARAMS = 256
+VOICEMEETER_METER_STRIP_MODE = 1
+METERS_BASE_FPS = 60
+METERS_MAX_SUBSCRIBERS = 8
+METERS_QUEUE_FRAMES = 4
+METERS_MAX_PEAK_HOLD_MS = 5000
 
+STATUS_ERROR_WINDOW_SECONDS = 60
+STATUS_ERROR_RATE_THRESHOLD = 0.25
+STATUS_ERROR_MIN_COMMANDS = 4
+STATUS_KEEPALIVE_SECONDS = 15.0
+STATUS_QUEUE_EVENTS = 8
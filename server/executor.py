@@ -1,29 +1,218 @@
 from __future__ import annotations
 
-import re
+import logging
+import os
 import subprocess
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Tuple
 
-from .config import BASE_ALLOWLIST
+from . import allowlist, metrics
+from .config import (
+    AppAllowlistEntry,
+    PROCESS_REAP_INTERVAL_SECONDS,
+    PROCESS_STAT_TTL_SECONDS,
+    PROCESS_TABLE_SIZE,
+)
 
 
-def _validate_args(args: List[str], patterns: List[str]) -> None:
+@dataclass
+class _Resolved:
+    entry: AppAllowlistEntry
+    executable: str
+    stat_key: Tuple[int, int, int]
+    checked_at: float
+
+
+@dataclass
+class ManagedProcess:
+    app: str
+    args: List[str]
+    process: subprocess.Popen
+    started_at: float
+    exited_at: float | None = None
+    returncode: int | None = None
+
+    def status(self, now: float) -> Dict[str, Any]:
+        end = self.exited_at if self.exited_at is not None else now
+        return {
+            "pid": self.process.pid,
+            "app": self.app,
+            "args": self.args,
+            "running": self.exited_at is None,
+            "returncode": self.returncode,
+            "started_at": self.started_at,
+            "exited_at": self.exited_at,
+            "runtime_s": round(end - self.started_at, 3),
+        }
+
+
+_LOCK = threading.Lock()
+_RESOLVED: Dict[str, _Resolved] = {}
+# pid -> process, oldest first; exited entries stay visible until the table needs room.
+_TABLE: Dict[int, ManagedProcess] = {}
+_REAPER_STOP = threading.Event()
+_REAPER_THREAD: threading.Thread | None = None
+
+
+def _validate_args(index: allowlist.AllowlistIndex, app_name: str, args: List[str]) -> None:
     for arg in args:
-        if not any(re.fullmatch(pat, arg) for pat in patterns):
-            raise ValueError(f"Argument not allowed: {arg}")
+        error = index.arg_error(app_name, arg)
+        if error:
+            raise ValueError(error)
+
 
+def _stat_key(path: str) -> Tuple[int, int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
 
-def run_allowed_app(app_name: str, args: List[str] | None) -> subprocess.Popen:
-    entry = BASE_ALLOWLIST.get(app_name)
+
+def _resolve_locked(index: allowlist.AllowlistIndex, app_name: str) -> _Resolved:
+    # Re-stat at most every PROCESS_STAT_TTL_SECONDS; a changed or missing file, or a
+    # swapped allowlist entry, drops the cached resolution.
+    entry = index.apps.get(app_name)
     if not entry:
         raise ValueError("Unknown app")
-    if not entry.path.exists():
-        raise ValueError("Configured app path does not exist")
+    now = time.monotonic()
+    cached = _RESOLVED.get(app_name)
+    if cached is not None and cached.entry is entry and now - cached.checked_at < PROCESS_STAT_TTL_SECONDS:
+        return cached
+    try:
+        stat_key = _stat_key(str(entry.path))
+    except OSError:
+        _RESOLVED.pop(app_name, None)
+        raise ValueError("Configured app path does not exist") from None
+    if cached is None or cached.entry is not entry or cached.stat_key != stat_key:
+        cached = _Resolved(entry, str(Path(entry.path)), stat_key, now)
+        _RESOLVED[app_name] = cached
+    else:
+        cached.checked_at = now
+    return cached
+
+
+def _running_locked(app_name: str) -> List[ManagedProcess]:
+    return [proc for proc in _TABLE.values() if proc.app == app_name and proc.exited_at is None]
+
+
+def _running_count_locked() -> int:
+    return sum(1 for proc in _TABLE.values() if proc.exited_at is None)
+
+
+def _make_room_locked() -> None:
+    while len(_TABLE) >= PROCESS_TABLE_SIZE:
+        oldest_exited = next((pid for pid, proc in _TABLE.items() if proc.exited_at is not None), None)
+        if oldest_exited is None:
+            raise ValueError(f"Process table full ({PROCESS_TABLE_SIZE} running)")
+        del _TABLE[oldest_exited]
+
+
+def launch(app_name: str, args: List[str] | None) -> Dict[str, Any]:
+    args = list(args or [])
+    # One allowlist snapshot for the whole launch, even if a reload lands in between.
+    index = allowlist.INDEX
+    _validate_args(index, app_name, args)
+    # Held across Popen so concurrent launches cannot both pass the instance limit.
+    with _LOCK:
+        resolved = _resolve_locked(index, app_name)
+        limit = resolved.entry.max_instances
+        running = _running_locked(app_name)
+        if limit is not None and len(running) >= limit:
+            pids = [proc.process.pid for proc in running]
+            return {"pid": pids[-1], "launched": False, "running": pids}
+        _make_room_locked()
+        try:
+            process = subprocess.Popen([resolved.executable, *args], shell=False)
+        except FileNotFoundError:
+            _RESOLVED.pop(app_name, None)
+            raise ValueError("Configured app path does not exist") from None
+        _TABLE.pop(process.pid, None)
+        _TABLE[process.pid] = ManagedProcess(app_name, args, process, time.time())
+        _ensure_reaper_locked()
+    metrics.PROCESS_LAUNCHES.inc(app_name)
+    return {"pid": process.pid, "launched": True}
+
+
+def _ensure_reaper_locked() -> None:
+    global _REAPER_THREAD
+    if _REAPER_THREAD is not None and _REAPER_THREAD.is_alive():
+        return
+    _REAPER_STOP.clear()
+    _REAPER_THREAD = threading.Thread(target=_reap_loop, name="process-reaper", daemon=True)
+    _REAPER_THREAD.start()
+
+
+def _reap_once() -> int:
+    exited: List[ManagedProcess] = []
+    with _LOCK:
+        running = [proc for proc in _TABLE.values() if proc.exited_at is None]
+        for proc in running:
+            returncode = proc.process.poll()
+            if returncode is not None:
+                proc.returncode = returncode
+                proc.exited_at = time.time()
+                exited.append(proc)
+        remaining = len(running) - len(exited)
+    logger = logging.getLogger("agent")
+    for proc in exited:
+        logger.info(
+            "process_exit",
+            extra={
+                "extra": {
+                    "event": "process_exit",
+                    "app": proc.app,
+                    "pid": proc.process.pid,
+                    "returncode": proc.returncode,
+                    "runtime_s": round(proc.exited_at - proc.started_at, 3),
+                }
+            },
+        )
+    return remaining
+
+
+def _reap_loop() -> None:
+    # Exits once nothing is running; the next launch starts it again.
+    global _REAPER_THREAD
+    while not _REAPER_STOP.wait(PROCESS_REAP_INTERVAL_SECONDS):
+        if _reap_once() == 0:
+            with _LOCK:
+                if not _running_count_locked():
+                    _REAPER_THREAD = None
+                    return
+
+
+def stop_reaper() -> None:
+    global _REAPER_THREAD
+    _REAPER_STOP.set()
+    thread = _REAPER_THREAD
+    if thread is not None:
+        thread.join(timeout=2.0)
+    _REAPER_THREAD = None
+
+
+def process_status(app_name: str | None = None, running_only: bool = False) -> Dict[str, Any]:
+    if app_name is not None and app_name not in allowlist.INDEX.apps:
+        raise ValueError("Unknown app")
+    now = time.time()
+    with _LOCK:
+        procs = [
+            proc.status(now)
+            for proc in _TABLE.values()
+            if (app_name is None or proc.app == app_name) and not (running_only and proc.exited_at is not None)
+        ]
+    return {"processes": procs, "running": sum(1 for proc in procs if proc["running"])}
+
+
+def process_stats() -> Dict[str, int]:
+    with _LOCK:
+        return {"tracked": len(_TABLE), "running": _running_count_locked(), "capacity": PROCESS_TABLE_SIZE}
 
-    argv = [str(Path(entry.path))]
-    if args:
-        _validate_args(args, entry.allowed_args_patterns)
-        argv.extend(args)
 
-    return subprocess.Popen(argv, shell=False)
+def running_by_app() -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    with _LOCK:
+        for proc in _TABLE.values():
+            if proc.exited_at is None:
+                counts[proc.app] = counts.get(proc.app, 0) + 1
+    return counts
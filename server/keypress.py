@@ -1,87 +1,165 @@
 from __future__ import annotations
 
-from typing import Iterable
-from pynput.keyboard import Controller, Key
-
-from .config import ALLOWED_KEYS
-
-
-KEY_MAP = {
-    "enter": Key.enter,
-    "esc": Key.esc,
-    "tab": Key.tab,
-    "space": Key.space,
-    "backspace": Key.backspace,
-    "delete": Key.delete,
-    "left": Key.left,
-    "right": Key.right,
-    "up": Key.up,
-    "down": Key.down,
-    "home": Key.home,
-    "end": Key.end,
-    "page_up": Key.page_up,
-    "page_down": Key.page_down,
-    "f1": Key.f1,
-    "f2": Key.f2,
-    "f3": Key.f3,
-    "f4": Key.f4,
-    "f5": Key.f5,
-    "f6": Key.f6,
-    "f7": Key.f7,
-    "f8": Key.f8,
-    "f9": Key.f9,
-    "f10": Key.f10,
-    "f11": Key.f11,
-    "f12": Key.f12,
-    "ctrl": Key.ctrl,
-    "alt": Key.alt,
-    "shift": Key.shift,
-    "cmd": Key.cmd,
-    "win": Key.cmd,
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+from . import allowlist
+from .config import KEY_SEQUENCE_MAX_CHORDS, KEY_SEQUENCE_MAX_DELAY_MS
+
+
+KEY_NAMES = {
+    "enter": "enter",
+    "esc": "esc",
+    "tab": "tab",
+    "space": "space",
+    "backspace": "backspace",
+    "delete": "delete",
+    "left": "left",
+    "right": "right",
+    "up": "up",
+    "down": "down",
+    "home": "home",
+    "end": "end",
+    "page_up": "page_up",
+    "page_down": "page_down",
+    "f1": "f1",
+    "f2": "f2",
+    "f3": "f3",
+    "f4": "f4",
+    "f5": "f5",
+    "f6": "f6",
+    "f7": "f7",
+    "f8": "f8",
+    "f9": "f9",
+    "f10": "f10",
+    "f11": "f11",
+    "f12": "f12",
+    "ctrl": "ctrl",
+    "alt": "alt",
+    "shift": "shift",
+    "cmd": "cmd",
+    "win": "cmd",
 }
 
 
+MODIFIER_KEYS = frozenset({"ctrl", "alt", "shift", "cmd", "win"})
+
+_INPUT_LOCK = threading.Lock()
+_LOAD_LOCK = threading.Lock()
+_CONTROLLER: Any = None
+_RESOLVED_KEYS: Dict[str, Any] | None = None
+IMPORT_MS: float | None = None
+
+Chord = Tuple[List[Any], List[Any]]
+
+
 def validate_keys(keys: Iterable[str]) -> None:
+    allowed = allowlist.INDEX.keys
     for k in keys:
-        if k.lower() not in ALLOWED_KEYS:
+        if k.lower() not in allowed:
             raise ValueError(f"Key not allowed: {k}")
 
 
-def send_keys(keys: Iterable[str]) -> None:
-    controller = Controller()
-    modifier_set = {"ctrl", "alt", "shift", "cmd", "win"}
-    modifiers: list[str] = []
-    non_modifiers: list[str] = []
+def _resolved_keys() -> Dict[str, Any]:
+    global _RESOLVED_KEYS, IMPORT_MS
+    if _RESOLVED_KEYS is not None:
+        return _RESOLVED_KEYS
+    with _LOAD_LOCK:
+        if _RESOLVED_KEYS is None:
+            started = time.perf_counter()
+            from pynput.keyboard import Key
+
+            IMPORT_MS = round((time.perf_counter() - started) * 1000.0, 1)
+            # Named keys only; single characters are sent as themselves.
+            _RESOLVED_KEYS = {name: getattr(Key, key) for name, key in KEY_NAMES.items()}
+    return _RESOLVED_KEYS
+
+
+def _resolve_chord(keys: Iterable[str], allowed: FrozenSet[str]) -> Chord:
+    resolved_keys = _resolved_keys()
+    modifiers: list[Any] = []
+    non_modifiers: list[Any] = []
     seen_mods: set[str] = set()
 
     for k in keys:
         k_low = k.lower()
-        if k_low in modifier_set:
+        if k_low not in allowed:
+            raise ValueError(f"Key not allowed: {k}")
+        resolved = resolved_keys.get(k_low, k_low)
+        if k_low in MODIFIER_KEYS:
             if k_low not in seen_mods:
-                modifiers.append(k_low)
+                modifiers.append(resolved)
                 seen_mods.add(k_low)
         else:
-            non_modifiers.append(k_low)
+            non_modifiers.append(resolved)
 
     if not non_modifiers:
         raise ValueError("At least one non-modifier key is required")
+    return modifiers, non_modifiers
 
-    def _press(key_name: str) -> None:
-        if key_name in KEY_MAP:
-            controller.press(KEY_MAP[key_name])
-        else:
-            controller.press(key_name)
 
-    def _release(key_name: str) -> None:
-        if key_name in KEY_MAP:
-            controller.release(KEY_MAP[key_name])
-        else:
-            controller.release(key_name)
+def _controller() -> Any:
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        _resolved_keys()
+        from pynput.keyboard import Controller
 
+        _CONTROLLER = Controller()
+    return _CONTROLLER
+
+
+def warm_up() -> None:
+    with _INPUT_LOCK:
+        _controller()
+
+
+def is_warm() -> bool:
+    return _CONTROLLER is not None
+
+
+def _send_chord(controller: Any, chord: Chord) -> None:
+    modifiers, non_modifiers = chord
     for m in modifiers:
-        _press(m)
+        controller.press(m)
     for k in non_modifiers:
-        _press(k)
-        _release(k)
+        controller.press(k)
+        controller.release(k)
     for m in reversed(modifiers):
-        _release(m)
+        controller.release(m)
+
+
+def send_keys(keys: Iterable[str]) -> None:
+    chord = _resolve_chord(keys, allowlist.INDEX.keys)
+    with _INPUT_LOCK:
+        _send_chord(_controller(), chord)
+
+
+def validate_key_sequence(chords: List[List[str]], delays_ms: List[int]) -> None:
+    if not chords:
+        raise ValueError("Chords must not be empty")
+    if len(chords) > KEY_SEQUENCE_MAX_CHORDS:
+        raise ValueError(f"At most {KEY_SEQUENCE_MAX_CHORDS} chords per sequence")
+    if len(delays_ms) != len(chords):
+        raise ValueError("One delay per chord is required")
+    for delay in delays_ms:
+        if delay < 0 or delay > KEY_SEQUENCE_MAX_DELAY_MS:
+            raise ValueError(f"Delay must be between 0 and {KEY_SEQUENCE_MAX_DELAY_MS} ms")
+    for keys in chords:
+        validate_keys(keys)
+        if all(k.lower() in MODIFIER_KEYS for k in keys):
+            raise ValueError("At least one non-modifier key is required")
+
+
+def send_key_sequence(chords: List[List[str]], delays_ms: List[int]) -> int:
+    validate_key_sequence(chords, delays_ms)
+    allowed = allowlist.INDEX.keys
+    resolved = [_resolve_chord(keys, allowed) for keys in chords]
+
+    with _INPUT_LOCK:
+        controller = _controller()
+        for pos, chord in enumerate(resolved):
+            _send_chord(controller, chord)
+            if delays_ms[pos] and pos < len(resolved) - 1:
+                time.sleep(delays_ms[pos] / 1000.0)
+    return len(resolved)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+
+from . import tracing
+from .config import LANE_QUEUE_LIMITS, LANE_WORKERS
+
+
+class LaneBusyError(RuntimeError):
+    pass
+
+
+class QueueDeadlineError(RuntimeError):
+    pass
+
+
+_Job = Tuple[Future, Callable[..., Any], Tuple[Any, ...], contextvars.Context, float]
+# Queue items are (priority, seq, job): lower priority runs first, FIFO within a priority.
+_Item = Tuple[int, int, "_Job | None"]
+_STOP_PRIORITY = 1 << 30
+_SEQ = itertools.count()
+
+
+def _call(enqueued: float, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+    started = time.perf_counter()
+    tracing.record("queue", started - enqueued)
+    try:
+        return fn(*args)
+    finally:
+        tracing.record("run", time.perf_counter() - started)
+
+
+class Lane:
+    def __init__(self, name: str, workers: int, max_queue: int) -> None:
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self.expired = 0
+        self.completed = 0
+        self._active = 0
+        self._queue: queue.PriorityQueue[_Item] = queue.PriorityQueue(maxsize=max_queue)
+        self._threads: List[threading.Thread] = []
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"lane-{self.name}-{idx}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self) -> None:
+        while (job := self._queue.get()[2]) is not None:
+            future, fn, args, context, enqueued = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            self._active += 1
+            try:
+                future.set_result(context.run(_call, enqueued, fn, args))
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                self._active -= 1
+                self.completed += 1
+
+    def submit(self, fn: Callable[..., Any], *args: Any, priority: int = 0) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            job = (future, fn, args, contextvars.copy_context(), time.perf_counter())
+            self._queue.put_nowait((priority, next(_SEQ), job))
+        except queue.Full:
+            self.rejected += 1
+            logging.getLogger("agent").warning(
+                "lane_busy",
+                extra={"extra": {"event": "lane_busy", "lane": self.name, "depth": self.max_queue}},
+            )
+            raise LaneBusyError(f"{self.name} lane is busy ({self.max_queue} queued); retry later") from None
+        return future
+
+    async def run(
+        self, fn: Callable[..., Any], *args: Any, priority: int = 0, max_wait: float | None = None
+    ) -> Any:
+        future = self.submit(fn, *args, priority=priority)
+        waiter = asyncio.wrap_future(future)
+        if max_wait is None:
+            return await waiter
+        # A job that has not started within max_wait is cancelled; the worker skips it.
+        done, _ = await asyncio.wait((waiter,), timeout=max_wait)
+        if not done and future.cancel():
+            self.expired += 1
+            raise QueueDeadlineError(f"{self.name} lane did not start the command within {max_wait * 1000:.0f} ms")
+        return await waiter
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "depth": self._queue.qsize(),
+            "active": self._active,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "expired": self.expired,
+            "completed": self.completed,
+        }
+
+    def stop(self) -> None:
+        for _ in self._threads:
+            try:
+                self._queue.put((_STOP_PRIORITY, next(_SEQ), None), timeout=1.0)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+
+
+LANES: Dict[str, Lane] = {
+    name: Lane(name, LANE_WORKERS.get(name, 1), limit) for name, limit in LANE_QUEUE_LIMITS.items()
+}
+
+
+def get_lane(name: str) -> Lane:
+    return LANES[name]
+
+
+def lane_stats() -> Dict[str, Dict[str, int]]:
+    return {name: lane.stats() for name, lane in LANES.items()}
+
+
+def stop_all() -> None:
+    for lane in LANES.values():
+        lane.stop()
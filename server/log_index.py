@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import logging
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Sidecar line per log entry: "<offset>\t<unix ts>\t<key>\t<key>...". Keys are
+# "r:<request_id>", "a:<action or event>" and "l:<LEVEL>".
+SIDECAR_SUFFIX = ".idx"
+
+_Key = str
+
+
+def _key(kind: str, value: Any) -> _Key:
+    return f"{kind}:{value}".replace("\t", " ").replace("\n", " ").replace("\r", " ")
+
+
+def entry_keys(data: Dict[str, Any], level: str, message: str) -> Tuple[_Key, ...]:
+    keys = {_key("l", level), _key("a", data.get("action") or data.get("event") or message)}
+    if data.get("request_id"):
+        keys.add(_key("r", data["request_id"]))
+    items = data.get("items")
+    if isinstance(items, list):
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if item.get("request_id"):
+                keys.add(_key("r", item["request_id"]))
+            if item.get("action"):
+                keys.add(_key("a", item["action"]))
+    return tuple(sorted(keys))
+
+
+def record_keys(record: logging.LogRecord) -> Tuple[_Key, ...]:
+    extra = record.extra if isinstance(getattr(record, "extra", None), dict) else {}
+    return entry_keys(extra, record.levelname, record.getMessage())
+
+
+def _parse_ts(value: Any) -> float | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        return dt.datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+class FileIndex:
+    def __init__(self) -> None:
+        self.offsets = array("q")
+        self.timestamps = array("d")
+        self.keys: List[Tuple[_Key, ...]] = []
+        self.postings: Dict[_Key, List[int]] = {}
+
+    def add(self, offset: int, ts: float, keys: Tuple[_Key, ...]) -> None:
+        # Lines are appended in time order; clamp so bisect over timestamps stays valid.
+        if self.timestamps and ts < self.timestamps[-1]:
+            ts = self.timestamps[-1]
+        pos = len(self.offsets)
+        self.offsets.append(offset)
+        self.timestamps.append(ts)
+        self.keys.append(keys)
+        for key in keys:
+            self.postings.setdefault(key, []).append(pos)
+
+    def search(self, keys: Sequence[_Key], since: float | None, until: float | None) -> Iterable[int]:
+        lo = bisect_left(self.timestamps, since) if since is not None else 0
+        hi = bisect_right(self.timestamps, until) if until is not None else len(self.timestamps)
+        if lo >= hi:
+            return []
+        if not keys:
+            return range(hi - 1, lo - 1, -1)
+        lists = sorted((self.postings.get(key, []) for key in keys), key=len)
+        smallest = lists[0]
+        start = bisect_left(smallest, lo)
+        end = bisect_left(smallest, hi)
+        others = keys if len(keys) > 1 else ()
+        return (
+            pos
+            for pos in reversed(smallest[start:end])
+            if all(key in self.keys[pos] for key in others)
+        )
+
+
+class LogIndex:
+    def __init__(self, log_path: Path, backup_count: int) -> None:
+        self.log_path = log_path
+        self.backup_count = backup_count
+        self.files: List[FileIndex] = [FileIndex() for _ in range(backup_count + 1)]
+        self._lock = threading.Lock()
+        self._sidecar: IO[str] | None = None
+
+    def path_for(self, idx: int) -> Path:
+        return self.log_path if idx == 0 else self.log_path.with_name(f"{self.log_path.name}.{idx}")
+
+    def _sidecar_path(self, idx: int) -> Path:
+        path = self.path_for(idx)
+        return path.with_name(path.name + SIDECAR_SUFFIX)
+
+    def load(self) -> Dict[str, int]:
+        stats = {"files": 0, "entries": 0, "scanned_lines": 0}
+        for idx in range(self.backup_count + 1):
+            if not self.path_for(idx).exists():
+                self._sidecar_path(idx).unlink(missing_ok=True)
+                continue
+            file_index, scanned = self._load_file(idx)
+            with self._lock:
+                self.files[idx] = file_index
+            stats["files"] += 1
+            stats["entries"] += len(file_index.offsets)
+            stats["scanned_lines"] += scanned
+        return stats
+
+    def _load_file(self, idx: int) -> Tuple[FileIndex, int]:
+        file_index = FileIndex()
+        log_path = self.path_for(idx)
+        sidecar_path = self._sidecar_path(idx)
+        size = log_path.stat().st_size
+        valid_lines: List[str] = []
+        stale = False
+        if sidecar_path.exists():
+            for line in sidecar_path.read_text(encoding="utf-8").splitlines():
+                parts = line.split("\t")
+                try:
+                    offset, ts = int(parts[0]), float(parts[1])
+                except (IndexError, ValueError):
+                    stale = True
+                    break
+                if offset >= size or (file_index.offsets and offset <= file_index.offsets[-1]):
+                    stale = True
+                    break
+                file_index.add(offset, ts, tuple(parts[2:]))
+                valid_lines.append(line + "\n")
+
+        resume = 0
+        appended: List[str] = []
+        with log_path.open("rb") as handle:
+            if file_index.offsets:
+                handle.seek(file_index.offsets[-1])
+                handle.readline()
+                resume = handle.tell()
+            handle.seek(resume)
+            scanned = 0
+            while True:
+                offset = handle.tell()
+                raw = handle.readline()
+                if not raw or not raw.endswith(b"\n"):
+                    break
+                scanned += 1
+                try:
+                    data = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                ts = _parse_ts(data.get("timestamp_utc"))
+                if ts is None:
+                    ts = file_index.timestamps[-1] if file_index.timestamps else 0.0
+                keys = entry_keys(data, str(data.get("level", "")), str(data.get("message", "")))
+                file_index.add(offset, ts, keys)
+                appended.append(self._sidecar_line(offset, ts, keys))
+
+        if appended or stale:
+            sidecar_path.write_text("".join(valid_lines + appended), encoding="utf-8")
+        return file_index, scanned
+
+    def _sidecar_line(self, offset: int, ts: float, keys: Tuple[_Key, ...]) -> str:
+        return "\t".join([str(offset), f"{ts:.6f}", *keys]) + "\n"
+
+    def add_batch(self, entries: List[Tuple[int, float, Tuple[_Key, ...]]]) -> None:
+        with self._lock:
+            current = self.files[0]
+            for offset, ts, keys in entries:
+                current.add(offset, ts, keys)
+        if self._sidecar is None:
+            self._sidecar = self._sidecar_path(0).open("a", encoding="utf-8")
+        self._sidecar.write("".join(self._sidecar_line(*entry) for entry in entries))
+        self._sidecar.flush()
+
+    def rollover(self, rotate_logs: Callable[[], None]) -> None:
+        # Held across the log file renames so queries never read a shifted file.
+        with self._lock:
+            self.close()
+            rotate_logs()
+            for idx in range(self.backup_count - 1, -1, -1):
+                source = self._sidecar_path(idx)
+                if source.exists():
+                    os.replace(source, self._sidecar_path(idx + 1))
+            self.files = [FileIndex()] + self.files[: self.backup_count]
+
+    def close(self) -> None:
+        if self._sidecar is not None:
+            self._sidecar.close()
+            self._sidecar = None
+
+    def query(
+        self,
+        request_id: str | None = None,
+        action: str | None = None,
+        level: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        limit: int = 100,
+    ) -> Dict[str, Any]:
+        keys = []
+        if request_id:
+            keys.append(_key("r", request_id))
+        if action:
+            keys.append(_key("a", action))
+        if level:
+            keys.append(_key("l", level.upper()))
+
+        entries: List[Dict[str, Any]] = []
+        truncated = False
+        with self._lock:
+            for idx, file_index in enumerate(self.files):
+                if truncated:
+                    break
+                positions = iter(file_index.search(keys, since, until))
+                first = next(positions, None)
+                if first is None:
+                    continue
+                with self.path_for(idx).open("rb") as handle:
+                    for pos in (first, *positions):
+                        if len(entries) >= limit:
+                            truncated = True
+                            break
+                        handle.seek(file_index.offsets[pos])
+                        try:
+                            entries.append(json.loads(handle.readline()))
+                        except ValueError:
+                            continue
+        return {"count": len(entries), "truncated": truncated, "entries": entries}
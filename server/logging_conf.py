@@ -2,11 +2,36 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import queue
+import threading
+import time
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
-from .config import APPDATA_LOG_DIR
+from .config import (
+    APPDATA_LOG_DIR,
+    LOG_BACKUP_COUNT,
+    LOG_BATCH_MAX,
+    LOG_MAX_BYTES,
+    LOG_OVERFLOW_POLICY,
+    LOG_QUEUE_SIZE,
+)
+from .log_index import LogIndex, record_keys
+
+
+_TS_CACHE: Tuple[int, str] = (-1, "")
+
+
+def format_utc(created: float) -> str:
+    global _TS_CACHE
+    second = int(created)
+    cached_second, prefix = _TS_CACHE
+    if second != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _TS_CACHE = (second, prefix)
+    return f"{prefix}.{int((created - second) * 1_000_000):06d}+00:00"
 
 
 class JsonLineFormatter(logging.Formatter):
@@ -18,20 +43,191 @@ class JsonLineFormatter(logging.Formatter):
         }
         if hasattr(record, "extra") and isinstance(record.extra, dict):
             base.update(record.extra)
+        if "timestamp_utc" not in base:
+            base["timestamp_utc"] = format_utc(record.created)
         return json.dumps(base, ensure_ascii=False)
 
 
+class BatchingRotatingFileHandler(RotatingFileHandler):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.index: LogIndex | None = None
+        self._pending_index: List[Tuple[int, float, Tuple[str, ...]]] = []
+
+    def _open(self) -> Any:
+        # Byte offsets are tracked here instead of calling tell(), which flushes a text stream
+        # on every record. newline="" keeps bytes written equal to the encoded line.
+        stream = open(self.baseFilename, self.mode, encoding=self.encoding, errors=self.errors, newline="")
+        self._offset = os.fstat(stream.fileno()).st_size
+        return stream
+
+    def write_batch(self, records: List[logging.LogRecord]) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        self._pending_index = []
+        for record in records:
+            try:
+                line = self.format(record) + self.terminator
+                size = len(line.encode(self.encoding or "utf-8"))
+                if self.maxBytes > 0 and self._offset + size >= self.maxBytes:
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                offset = self._offset
+                self.stream.write(line)
+                self._offset += size
+                if self.index is not None:
+                    self._pending_index.append((offset, record.created, record_keys(record)))
+            except Exception:
+                self.handleError(record)
+        self.flush()
+        self._flush_index()
+
+    def _flush_index(self) -> None:
+        pending, self._pending_index = self._pending_index, []
+        if self.index is None or not pending:
+            return
+        try:
+            self.index.add_batch(pending)
+        except Exception:
+            # The sidecar is rebuilt from the log on next startup.
+            pass
+
+    def doRollover(self) -> None:
+        if self.index is None:
+            super().doRollover()
+            return
+        self.flush()
+        self._flush_index()
+        self.index.rollover(super().doRollover)
+
+
+class QueueLogHandler(logging.Handler):
+    def __init__(self, target: BatchingRotatingFileHandler) -> None:
+        super().__init__()
+        self.target = target
+        self.block = LOG_OVERFLOW_POLICY == "block"
+        self.queue: queue.Queue[logging.LogRecord | None] = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._reported_dropped = 0
+        self._writer = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+        self._writer.start()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.block:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self) -> None:
+        running = True
+        while running:
+            record = self.queue.get()
+            batch: List[logging.LogRecord] = []
+            while True:
+                if record is None:
+                    running = False
+                    break
+                batch.append(record)
+                if len(batch) >= LOG_BATCH_MAX:
+                    break
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                batch.append(self._dropped_record(dropped - self._reported_dropped, dropped))
+                self._reported_dropped = dropped
+            if batch:
+                try:
+                    self.target.write_batch(batch)
+                except Exception:
+                    # Never let one bad batch end the writer thread.
+                    self.handleError(batch[-1])
+                    continue
+                self.written += len(batch)
+                self.batches += 1
+
+    def _dropped_record(self, since_last: int, total: int) -> logging.LogRecord:
+        record = logging.LogRecord("agent", logging.WARNING, __file__, 0, "log_dropped", None, None)
+        record.extra = {"event": "log_dropped", "dropped": since_last, "dropped_total": total}
+        return record
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "overflow_policy": "block" if self.block else "drop",
+        }
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self.queue.put(None)
+            self._writer.join(timeout=5.0)
+        self.target.close()
+        super().close()
+
+
+_QUEUE_HANDLER: QueueLogHandler | None = None
+_LOG_INDEX: LogIndex | None = None
+_LOG_INDEX_STATS: Dict[str, Any] = {}
+
+
 def setup_logging() -> Path:
+    global _QUEUE_HANDLER, _LOG_INDEX, _LOG_INDEX_STATS
     APPDATA_LOG_DIR.mkdir(parents=True, exist_ok=True)
     log_path = APPDATA_LOG_DIR / "agent.log"
 
     root = logging.getLogger()
     root.setLevel(logging.INFO)
 
-    handler = RotatingFileHandler(log_path, maxBytes=1_000_000, backupCount=5, encoding="utf-8")
-    handler.setFormatter(JsonLineFormatter())
-
-    if not any(isinstance(h, RotatingFileHandler) for h in root.handlers):
-        root.addHandler(handler)
+    if not any(isinstance(h, QueueLogHandler) for h in root.handlers):
+        started = time.perf_counter()
+        _LOG_INDEX = LogIndex(log_path, LOG_BACKUP_COUNT)
+        _LOG_INDEX_STATS = _LOG_INDEX.load()
+        _LOG_INDEX_STATS["load_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+        target = BatchingRotatingFileHandler(
+            log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+        )
+        target.setFormatter(JsonLineFormatter())
+        target.index = _LOG_INDEX
+        _QUEUE_HANDLER = QueueLogHandler(target)
+        root.addHandler(_QUEUE_HANDLER)
 
     return log_path
+
+
+def query_logs(**filters: Any) -> Dict[str, Any]:
+    if _LOG_INDEX is None:
+        raise RuntimeError("Logging is not set up")
+    return _LOG_INDEX.query(**filters)
+
+
+def log_index_stats() -> Dict[str, Any]:
+    return dict(_LOG_INDEX_STATS)
+
+
+def logging_stats() -> Dict[str, Any]:
+    if _QUEUE_HANDLER is None:
+        return {}
+    return _QUEUE_HANDLER.stats()
+
+
+def shutdown_logging() -> None:
+    global _QUEUE_HANDLER, _LOG_INDEX
+    if _QUEUE_HANDLER is None:
+        return
+    logging.getLogger().removeHandler(_QUEUE_HANDLER)
+    _QUEUE_HANDLER.close()
+    _QUEUE_HANDLER = None
+    if _LOG_INDEX is not None:
+        _LOG_INDEX.close()
+        _LOG_INDEX = None
@@ -1,74 +1,150 @@
 from __future__ import annotations
 
-import datetime as dt
+import asyncio
+import base64
+import json
 import logging
+import threading
 import time
-from typing import Any, Dict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
 
-from fastapi import Depends, FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import ValidationError
 
-from .auth import get_token_or_raise, verify_bearer
-from .executor import run_allowed_app
-from .keypress import send_keys, validate_keys
-from .logging_conf import setup_logging
+from .auth import check_bearer, get_token_or_raise, verify_bearer
+from .logging_conf import (
+    format_utc,
+    log_index_stats,
+    logging_stats,
+    query_logs,
+    setup_logging,
+    shutdown_logging,
+)
 from .models import (
-    CommandRequest,
+    BatchCommandRequest,
+    BatchCommandResponse,
+    CommandBase,
     CommandResponse,
-    KeyPressPayload,
-    RunAppPayload,
-    VoicemeeterApplyPayload,
-    VoicemeeterCommandPayload,
-    VoicemeeterGetPayload,
-    VoicemeeterGroupBusGainPayload,
-    VoicemeeterSetPayload,
 )
-from .config import DEFAULT_HOST, DEFAULT_PORT, VERSION
-from . import voicemeeter
+from .config import (
+    BATCH_MAX_COMMANDS,
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    LOG_QUERY_MAX_LIMIT,
+    STATUS_KEEPALIVE_SECONDS,
+    VERSION,
+    WS_MAX_INFLIGHT,
+)
+from . import (
+    IMPORT_STARTED,
+    actions,
+    admission,
+    allowlist,
+    executor,
+    keypress,
+    lanes,
+    meters,
+    metrics,
+    ramps,
+    replay,
+    status,
+    tracing,
+    voicemeeter,
+    wire,
+)
 
 
+IMPORT_MS = round((time.perf_counter() - IMPORT_STARTED) * 1000.0, 1)
+
 app = FastAPI()
 START_TIME = time.time()
-LAST_REQUEST_UTC: str | None = None
-
-
-def _now_utc() -> str:
-    return dt.datetime.utcnow().replace(tzinfo=dt.timezone.utc).isoformat()
+STARTUP_REPORT: Dict[str, Any] = {"import_ms": IMPORT_MS, "warmup": {}, "first_command_ms": {}}
+LAST_REQUEST_TS: float | None = None
+BATCH_SKIPPED_ERROR = "Skipped after earlier error"
 
 
 @app.on_event("startup")
 def on_startup() -> None:
+    started = time.perf_counter()
     get_token_or_raise()
     log_path = setup_logging()
+    allowlist.start_watcher()
+    threading.Thread(target=_warm_up_backends, name="warmup", daemon=True).start()
+    STARTUP_REPORT["startup_ms"] = round((time.perf_counter() - started) * 1000.0, 1)
     logging.getLogger("agent").info(
         "server_start",
         extra={
             "extra": {
                 "event": "startup",
-                "timestamp_utc": _now_utc(),
                 "log_path": str(log_path),
+                "log_index": log_index_stats(),
                 "host": DEFAULT_HOST,
                 "port": DEFAULT_PORT,
                 "version": VERSION,
+                "startup": {"import_ms": IMPORT_MS, "startup_ms": STARTUP_REPORT["startup_ms"]},
             }
         },
     )
 
 
+def _warm_up_backends() -> None:
+    # Pre-import and pre-login off the request path so the first command is not the slow one.
+    report: Dict[str, Any] = {}
+    for name, warm_up in (("voicemeeter", voicemeeter.warm_up), ("keyboard", keypress.warm_up)):
+        started = time.perf_counter()
+        try:
+            warm_up()
+            report[name] = {"ok": True}
+        except Exception as exc:
+            report[name] = {"ok": False, "error": str(exc)}
+        report[name]["ms"] = round((time.perf_counter() - started) * 1000.0, 1)
+    report["voicemeeter"].update(import_ms=voicemeeter.IMPORT_MS, login_ms=voicemeeter.LOGIN_MS)
+    report["keyboard"]["import_ms"] = keypress.IMPORT_MS
+    voicemeeter.start_supervisor()
+    voicemeeter.start_mirror()
+    STARTUP_REPORT["warmup"] = report
+    logging.getLogger("agent").info(
+        "warmup_complete",
+        extra={"extra": {"event": "warmup_complete", **report}},
+    )
+
+
 @app.on_event("shutdown")
 def on_shutdown() -> None:
+    status.set_server("stopping")
+    meters.stop()
+    ramps.stop()
+    executor.stop_reaper()
+    admission.flush()
+    allowlist.stop_watcher()
+    # Queued lane jobs drain before the Voicemeeter client they use is logged out.
+    lanes.stop_all()
     voicemeeter.shutdown_vm()
     logging.getLogger("agent").info(
         "server_stop",
-        extra={"extra": {"event": "shutdown", "timestamp_utc": _now_utc()}},
+        extra={"extra": {"event": "shutdown"}},
     )
+    shutdown_logging()
+
+
+_TRACED_PATHS = {"/command", "/commands"}
 
 
 @app.middleware("http")
-async def track_last_request(request: Request, call_next):
-    global LAST_REQUEST_UTC
-    LAST_REQUEST_UTC = _now_utc()
+async def track_request(request: Request, call_next):
+    global LAST_REQUEST_TS
+    LAST_REQUEST_TS = time.time()
+    path = request.url.path
+    if path not in _TRACED_PATHS:
+        return await call_next(request)
+    trace = tracing.start()
     response = await call_next(request)
+    total = tracing.finish(trace, path, response.status_code)
+    response.headers["Server-Timing"] = tracing.server_timing(trace, total)
     return response
 
 
@@ -78,87 +154,645 @@ def health() -> Dict[str, Any]:
         "ok": True,
         "status": "running",
         "uptime_seconds": int(time.time() - START_TIME),
-        "last_request_utc": LAST_REQUEST_UTC,
+        "last_request_utc": format_utc(LAST_REQUEST_TS) if LAST_REQUEST_TS is not None else None,
         "version": VERSION,
+        "lanes": lanes.lane_stats(),
+        "logging": logging_stats(),
+        "state": status.snapshot(),
+        "voicemeeter": voicemeeter.connection_state(),
+        "replay": replay.stats(),
+        "admission": admission.stats(),
+        "allowlist": allowlist.state(),
+        "processes": executor.process_stats(),
+        "ready": {"voicemeeter": voicemeeter.is_warm(), "keyboard": keypress.is_warm()},
+        "startup": STARTUP_REPORT,
+    }
+
+
+@app.get("/health/events")
+async def health_events() -> StreamingResponse:
+    sub = status.subscribe(asyncio.get_running_loop())
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(sub.queue.get(), STATUS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    status.refresh()
+                    if sub.queue.empty():
+                        yield ": keepalive\n\n"
+                    continue
+                yield f"event: status\nid: {snapshot['seq']}\ndata: {json.dumps(snapshot)}\n\n"
+                if snapshot["server"] != "running":
+                    return
+        finally:
+            status.unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+def _seconds_since_last_request():
+    if LAST_REQUEST_TS is not None:
+        yield {}, round(time.time() - LAST_REQUEST_TS, 3)
+
+
+def _uptime_seconds():
+    yield {}, int(time.time() - START_TIME)
+
+
+def _processes_running():
+    for app_name, count in executor.running_by_app().items():
+        yield {"app": app_name}, count
+
+
+def _lane_depths():
+    for name, stats in lanes.lane_stats().items():
+        yield {"lane": name}, stats["depth"]
+
+
+def _log_dropped():
+    stats = logging_stats()
+    if stats:
+        yield {}, stats["dropped"]
+
+
+metrics.register(
+    metrics.Gauge("agent_seconds_since_last_request", "Seconds since the last HTTP request.", _seconds_since_last_request)
+)
+metrics.register(metrics.Gauge("agent_uptime_seconds", "Seconds since the server started.", _uptime_seconds))
+metrics.register(metrics.Gauge("agent_lane_depth", "Commands queued per executor lane.", _lane_depths))
+metrics.register(metrics.Gauge("agent_processes_running", "Launched apps still running, by app.", _processes_running))
+metrics.register(metrics.Gauge("agent_log_dropped", "Log records dropped because the log queue was full.", _log_dropped))
+
+
+@app.get("/metrics")
+def metrics_endpoint(_auth: None = Depends(verify_bearer)) -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _parse_query_time(name: str, value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be unix seconds or ISO 8601") from None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+@app.get("/logs/query")
+async def logs_query(
+    request_id: str | None = None,
+    action: str | None = None,
+    level: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    last_minutes: float | None = None,
+    limit: int = 100,
+    _auth: None = Depends(verify_bearer),
+) -> Dict[str, Any]:
+    if limit < 1 or limit > LOG_QUERY_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {LOG_QUERY_MAX_LIMIT}")
+    since_ts = _parse_query_time("since", since)
+    if last_minutes is not None:
+        since_ts = max(since_ts or 0.0, time.time() - last_minutes * 60.0)
+    started = time.perf_counter()
+    result = await run_in_threadpool(
+        query_logs,
+        request_id=request_id,
+        action=action,
+        level=level,
+        since=since_ts,
+        until=_parse_query_time("until", until),
+        limit=limit,
+    )
+    result["took_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+    return result
+
+
+def _observe_command(action: str, seconds: float, ok: bool) -> None:
+    metrics.observe_command(action, seconds, ok)
+    status.record_command(ok)
+    first = STARTUP_REPORT["first_command_ms"]
+    if action not in first:
+        first[action] = round(seconds * 1000.0, 3)
+        logging.getLogger("agent").info(
+            "first_command",
+            extra={"extra": {"event": "first_command", "action": action, "ok": ok, "latency_ms": first[action]}},
+        )
+
+
+def _log_command(request_id: str, action: str, caller_ip: str, error: str | None) -> None:
+    logger = logging.getLogger("agent")
+    extra = {
+        "extra": {
+            "request_id": request_id,
+            "action": action,
+            "ok": error is None,
+            "error": error,
+            "caller_ip": caller_ip,
+        }
     }
+    with tracing.span("log"):
+        if error is None:
+            logger.info("command_ok", extra=extra)
+        else:
+            logger.error("command_error", extra=extra)
+
+
+_THROTTLED = (admission.RateLimitedError, lanes.QueueDeadlineError)
+_UNAVAILABLE = (lanes.LaneBusyError, voicemeeter.VoicemeeterUnavailableError)
+
+
+def _error_status(exc: Exception) -> int:
+    if isinstance(exc, _THROTTLED):
+        return 429
+    return 503 if isinstance(exc, _UNAVAILABLE) else 400
+
+
+async def _dispatch(spec: actions.ActionSpec, payload: Any, priority: int, max_wait: float) -> Dict[str, Any]:
+    # Coalesced writes only join a pending flush; they never hold a lane worker.
+    if spec.coalesced is not None and getattr(payload, "coalesce", None):
+        return await spec.coalesced(payload)
+    return await lanes.get_lane(spec.lane).run(spec.handler, payload, priority=priority, max_wait=max_wait)
+
+
+async def _execute_command(req: CommandBase, caller_ip: str) -> Tuple[CommandResponse, int]:
+    started = time.perf_counter()
+    try:
+        with tracing.span("admit"):
+            priority, max_wait = admission.admit(caller_ip, req.action)
+        with tracing.span("validate"):
+            spec = actions.validate(req)
+        result = await _dispatch(spec, req.payload, priority, max_wait)
+    except _THROTTLED as exc:
+        # Counted and summarised by admission instead of one command_error line per rejection.
+        if isinstance(exc, lanes.QueueDeadlineError):
+            admission.reject(caller_ip, req.action, "deadline")
+        _observe_command(req.action, time.perf_counter() - started, False)
+        return CommandResponse(request_id=req.request_id, ok=False, error=str(exc)), 429
+    except Exception as exc:
+        _observe_command(req.action, time.perf_counter() - started, False)
+        _log_command(req.request_id, req.action, caller_ip, str(exc))
+        return CommandResponse(request_id=req.request_id, ok=False, error=str(exc)), _error_status(exc)
+    _observe_command(req.action, time.perf_counter() - started, True)
+    _log_command(req.request_id, req.action, caller_ip, None)
+    return CommandResponse(request_id=req.request_id, ok=True, result=result), 200
+
+
+def _reject_payload(exc: actions.PayloadError, caller_ip: str) -> Tuple[CommandResponse, int]:
+    _observe_command(exc.action, 0.0, False)
+    _log_command(exc.request_id, exc.action, caller_ip, str(exc))
+    return CommandResponse(request_id=exc.request_id, ok=False, error=str(exc)), 400
+
+
+def _request_validation_error(exc: ValidationError, *prefix: Any) -> RequestValidationError:
+    errors = []
+    for error in exc.errors(include_url=False):
+        loc = error["loc"]
+        if loc and loc[0] in actions.ACTIONS:
+            loc = loc[1:]
+        errors.append({**error, "loc": ("body", *prefix, *loc)})
+    return RequestValidationError(errors)
+
+
+def _log_replayed(req: CommandBase, response: CommandResponse, kind: str, caller_ip: str) -> None:
+    logging.getLogger("agent").info(
+        "command_replayed",
+        extra={
+            "extra": {
+                "request_id": req.request_id,
+                "action": req.action,
+                "replay": kind,
+                "ok": response.ok,
+                "caller_ip": caller_ip,
+            }
+        },
+    )
+
+
+async def _execute(req: CommandBase, caller_ip: str) -> Tuple[CommandResponse, int]:
+    outcome, kind = await replay.run_once(req, caller_ip, lambda fresh: _execute_command(fresh, caller_ip))
+    if kind != "miss":
+        _log_replayed(req, outcome[0], kind, caller_ip)
+    return outcome
 
 
 @app.post("/command")
-def command(
-    req: CommandRequest,
+async def command(
     request: Request,
     _auth: None = Depends(verify_bearer),
-) -> JSONResponse:
-    logger = logging.getLogger("agent")
+) -> Response:
+    # The body goes straight to actions.parse_command: one validation pass for envelope and payload.
     caller_ip = request.client.host if request.client else "unknown"
+    trace = tracing.current()
+    codec = wire.request_codec(request.headers.get("content-type"))
+    with tracing.span("read"):
+        body = wire.decode(codec, await request.body())
     try:
-        if req.action == "run_app":
-            payload = RunAppPayload(**req.payload)
-            proc = run_allowed_app(payload.app, payload.args or [])
-            result = {"pid": proc.pid}
-        elif req.action == "key_press":
-            payload = KeyPressPayload(**req.payload)
-            validate_keys(payload.keys)
-            send_keys(payload.keys)
-            result = {"sent": payload.keys}
-        elif req.action == "voicemeeter_apply":
-            payload = VoicemeeterApplyPayload(**req.payload)
-            applied = voicemeeter.apply_settings(payload.settings)
-            result = {"applied": applied}
-        elif req.action == "voicemeeter_group_bus_gain":
-            payload = VoicemeeterGroupBusGainPayload(**req.payload)
-            result = voicemeeter.apply_group_bus_gain(payload.gain)
-        elif req.action == "voicemeeter_command":
-            payload = VoicemeeterCommandPayload(**req.payload)
-            voicemeeter.run_command(payload.command)
-            result = {"command": payload.command}
-        elif req.action == "voicemeeter_get":
-            payload = VoicemeeterGetPayload(**req.payload)
-            if payload.params is not None:
-                params = [param.dict() for param in payload.params]
-                values = voicemeeter.get_params(params)
-            else:
-                targets = payload.targets or []
-                fields = payload.fields or []
-                values = voicemeeter.get_targets_fields(targets, fields)
-            result = {"values": values}
-        elif req.action == "voicemeeter_set":
-            payload = VoicemeeterSetPayload(**req.payload)
-            params = [param.dict() for param in payload.params]
-            count = voicemeeter.set_params(params)
-            result = {"applied": count}
+        with tracing.span("parse"):
+            req = actions.parse_command(body)
+    except actions.PayloadError as exc:
+        response, status_code = _reject_payload(exc, caller_ip)
+    except ValidationError as exc:
+        raise _request_validation_error(exc) from None
+    else:
+        if trace is not None:
+            trace.request_id, trace.action = req.request_id, req.action
+        response, status_code = await _execute(req, caller_ip)
+    with tracing.span("encode"):
+        return wire.encode(wire.response_codec(request.headers.get("accept"), codec), response, status_code)
+
+
+def _apply_vm_group(
+    group: List[Tuple[int, Dict[str, Dict[str, Any]], Dict[str, Any]]],
+) -> None:
+    voicemeeter.apply_prepared_settings([settings for _, settings, _ in group])
+
+
+def _parse_batch(batch: BatchCommandRequest) -> List[CommandBase | actions.PayloadError]:
+    # Envelope errors reject the whole batch (422); payload errors only fail their item.
+    items: List[CommandBase | actions.PayloadError] = []
+    for idx, raw in enumerate(batch.commands):
+        try:
+            items.append(actions.parse_command(raw))
+        except actions.PayloadError as exc:
+            items.append(exc)
+        except ValidationError as exc:
+            raise _request_validation_error(exc, "commands", idx) from None
+    # Items are deduplicated by request_id across retries, so one batch cannot reuse an id.
+    seen = set()
+    for idx, item in enumerate(items):
+        if item.request_id in seen:
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "duplicate_request_id",
+                        "loc": ("body", "commands", idx, "request_id"),
+                        "msg": f"Duplicate request_id {item.request_id} in batch",
+                        "input": item.request_id,
+                    }
+                ]
+            )
+        seen.add(item.request_id)
+    return items
+
+
+def _mergeable(spec: actions.ActionSpec | None, payload: Any) -> bool:
+    return spec is not None and spec.prepare_write is not None and not getattr(payload, "coalesce", None)
+
+
+async def _run_batch(
+    items: List[CommandBase | actions.PayloadError], stop_on_error: bool, caller_ip: str
+) -> List[CommandResponse]:
+    results: List[CommandResponse | None] = [None] * len(items)
+    durations: List[float] = [0.0] * len(items)
+    # Items answered from the replay cache ran in an earlier request and are not observed again.
+    replayed: List[bool] = [False] * len(items)
+    owned: List[replay.Entry] = []
+
+    specs: List[actions.ActionSpec | None] = []
+    payloads: List[Any] = []
+    for idx, item in enumerate(items):
+        if isinstance(item, actions.PayloadError):
+            specs.append(None)
+            payloads.append(None)
+            results[idx] = CommandResponse(request_id=item.request_id, ok=False, error=str(item))
         else:
-            raise ValueError("Unknown action")
+            specs.append(actions.ACTIONS[item.action])
+            payloads.append(item.payload)
+    failed = False
 
-        logger.info(
-            "command_ok",
-            extra={
-                "extra": {
-                    "request_id": req.request_id,
-                    "action": req.action,
-                    "ok": True,
-                    "error": None,
-                    "caller_ip": caller_ip,
-                    "timestamp_utc": _now_utc(),
-                }
-            },
-        )
-        return JSONResponse(CommandResponse(request_id=req.request_id, ok=True, result=result).dict())
-    except Exception as exc:
-        logger.error(
-            "command_error",
+    async def claim(pos: int) -> replay.Entry | None:
+        outcome, entry, kind = await replay.claim(items[pos], caller_ip)
+        if entry is None:
+            results[pos] = outcome[0]
+            replayed[pos] = True
+            _log_replayed(items[pos], outcome[0], kind, caller_ip)
+        else:
+            owned.append(entry)
+        return entry
+
+    def settle(pos: int, entry: replay.Entry, response: CommandResponse, status_code: int) -> None:
+        results[pos] = response
+        replay.finish(entry, (response, status_code))
+
+    try:
+        idx = 0
+        while idx < len(items):
+            req = items[idx]
+            if results[idx] is not None:
+                # An invalid payload fails in its place; items before it have already run.
+                failed = failed or stop_on_error
+                idx += 1
+                continue
+            if failed:
+                results[idx] = CommandResponse(request_id=req.request_id, ok=False, error=BATCH_SKIPPED_ERROR)
+                idx += 1
+                continue
+
+            spec = specs[idx]
+            if not _mergeable(spec, payloads[idx]):
+                started = time.perf_counter()
+                entry = await claim(idx)
+                if entry is None:
+                    failed = stop_on_error and not results[idx].ok
+                    idx += 1
+                    continue
+                try:
+                    priority, max_wait = admission.admit(caller_ip, req.action)
+                    actions.validate(req)
+                    result = await _dispatch(spec, payloads[idx], priority, max_wait)
+                    settle(idx, entry, CommandResponse(request_id=req.request_id, ok=True, result=result), 200)
+                except Exception as exc:
+                    if isinstance(exc, lanes.QueueDeadlineError):
+                        admission.reject(caller_ip, req.action, "deadline")
+                    response = CommandResponse(request_id=req.request_id, ok=False, error=str(exc))
+                    settle(idx, entry, response, _error_status(exc))
+                    failed = stop_on_error
+                durations[idx] = time.perf_counter() - started
+                idx += 1
+                continue
+
+            # Consecutive settings writes share one validation pass and a single vm.apply.
+            started = time.perf_counter()
+            group: List[Tuple[int, Dict[str, Dict[str, Any]], Dict[str, Any]]] = []
+            entries: List[replay.Entry] = []
+            tickets: List[Tuple[int, float]] = []
+            while idx < len(items) and results[idx] is None and _mergeable(specs[idx], payloads[idx]):
+                entry = await claim(idx)
+                if entry is None:
+                    if stop_on_error and not results[idx].ok:
+                        failed = True
+                        idx += 1
+                        break
+                    idx += 1
+                    continue
+                try:
+                    ticket = admission.admit(caller_ip, items[idx].action)
+                    settings, result = specs[idx].prepare_write(payloads[idx])
+                    group.append((idx, settings, result))
+                    entries.append(entry)
+                    tickets.append(ticket)
+                except Exception as exc:
+                    response = CommandResponse(request_id=items[idx].request_id, ok=False, error=str(exc))
+                    settle(idx, entry, response, _error_status(exc))
+                    if stop_on_error:
+                        failed = True
+                        idx += 1
+                        break
+                idx += 1
+            if not group:
+                continue
+            try:
+                # The merged apply runs at its most urgent item's priority and tightest deadline.
+                priority = min(ticket[0] for ticket in tickets)
+                max_wait = min(ticket[1] for ticket in tickets)
+                await lanes.get_lane("voicemeeter").run(_apply_vm_group, group, priority=priority, max_wait=max_wait)
+            except Exception as exc:
+                if isinstance(exc, lanes.QueueDeadlineError):
+                    for pos, _, _ in group:
+                        admission.reject(caller_ip, items[pos].action, "deadline")
+                failed = failed or stop_on_error
+                status_code = _error_status(exc)
+                for (pos, _, _), entry in zip(group, entries):
+                    response = CommandResponse(request_id=items[pos].request_id, ok=False, error=str(exc))
+                    settle(pos, entry, response, status_code)
+            else:
+                for (pos, _, result), entry in zip(group, entries):
+                    settle(pos, entry, CommandResponse(request_id=items[pos].request_id, ok=True, result=result), 200)
+            elapsed = time.perf_counter() - started
+            for pos, _, _ in group:
+                durations[pos] = elapsed
+    except BaseException:
+        for entry in owned:
+            if not entry.future.done():
+                replay.abandon(entry)
+        raise
+
+    for req, res, duration, was_replayed in zip(items, results, durations, replayed):
+        if res is not None and not was_replayed:
+            _observe_command(req.action, duration, res.ok)
+    return [res for res in results if res is not None]
+
+
+@app.post("/commands")
+async def commands(
+    request: Request,
+    _auth: None = Depends(verify_bearer),
+) -> Response:
+    codec = wire.request_codec(request.headers.get("content-type"))
+    with tracing.span("read"):
+        body = wire.decode(codec, await request.body())
+    try:
+        with tracing.span("parse"):
+            if codec == wire.JSON:
+                batch = BatchCommandRequest.model_validate_json(body)
+            else:
+                batch = BatchCommandRequest.model_validate(body)
+    except ValidationError as exc:
+        raise _request_validation_error(exc) from None
+    if len(batch.commands) > BATCH_MAX_COMMANDS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {BATCH_MAX_COMMANDS} commands")
+    logger = logging.getLogger("agent")
+    caller_ip = request.client.host if request.client else "unknown"
+    with tracing.span("parse"):
+        items = _parse_batch(batch)
+    trace = tracing.current()
+    if trace is not None:
+        trace.action = "batch"
+    results = await _run_batch(items, batch.mode == "stop_on_error", caller_ip)
+    ok = all(res.ok for res in results)
+
+    with tracing.span("log"):
+        logger.log(
+            logging.INFO if ok else logging.ERROR,
+            "commands_ok" if ok else "commands_error",
             extra={
                 "extra": {
-                    "request_id": req.request_id,
-                    "action": req.action,
-                    "ok": False,
-                    "error": str(exc),
+                    "mode": batch.mode,
+                    "ok": ok,
+                    "items": [
+                        {"request_id": res.request_id, "action": req.action, "ok": res.ok, "error": res.error}
+                        for req, res in zip(items, results)
+                    ],
                     "caller_ip": caller_ip,
-                    "timestamp_utc": _now_utc(),
                 }
             },
         )
-        return JSONResponse(
-            CommandResponse(request_id=req.request_id, ok=False, error=str(exc)).dict(),
-            status_code=400,
+    with tracing.span("encode"):
+        return wire.encode(
+            wire.response_codec(request.headers.get("accept"), codec),
+            BatchCommandResponse(ok=ok, results=results),
+            200 if ok else 400,
         )
+
+
+@app.websocket("/ws")
+async def command_socket(websocket: WebSocket) -> None:
+    global LAST_REQUEST_TS
+    try:
+        check_bearer(websocket.headers.get("authorization"))
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    caller_ip = websocket.client.host if websocket.client else "unknown"
+    # Frames execute in arrival order; the bounded queue lets clients pipeline
+    # without waiting for each response while keeping writes ordered. Rejected
+    # frames queue their response too, so replies always come back in frame order.
+    queue: asyncio.Queue[CommandBase | actions.PayloadError | CommandResponse | None] = asyncio.Queue(
+        maxsize=WS_MAX_INFLIGHT
+    )
+
+    async def worker() -> None:
+        while (req := await queue.get()) is not None:
+            if isinstance(req, CommandResponse):
+                response = req
+            elif isinstance(req, actions.PayloadError):
+                response, _ = _reject_payload(req, caller_ip)
+            else:
+                response, _ = await _execute(req, caller_ip)
+            await websocket.send_json(response.dict())
+
+    worker_task = asyncio.create_task(worker())
+    try:
+        while not worker_task.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            LAST_REQUEST_TS = time.time()
+            frame = message.get("text")
+            if frame is None:
+                req = CommandResponse(request_id="", ok=False, error="Binary frames are not supported; send JSON text")
+            else:
+                try:
+                    req = actions.parse_command(frame)
+                except actions.PayloadError as exc:
+                    req = exc
+                except ValidationError as exc:
+                    req = CommandResponse(request_id=_frame_request_id(frame), ok=False, error=str(exc))
+            if not queue.full():
+                queue.put_nowait(req)
+                continue
+            # A full queue waits for the worker, which may itself have died on a failed send.
+            put_task = asyncio.create_task(queue.put(req))
+            await asyncio.wait((put_task, worker_task), return_when=asyncio.FIRST_COMPLETED)
+            if not put_task.done():
+                put_task.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker_task.cancel()
+    if worker_task.done() and not worker_task.cancelled() and worker_task.exception() is not None:
+        try:
+            await websocket.close(code=1011)
+        except (RuntimeError, WebSocketDisconnect):
+            pass
+
+
+def _frame_request_id(frame: str) -> str:
+    try:
+        data = json.loads(frame)
+    except ValueError:
+        return ""
+    if isinstance(data, dict) and isinstance(data.get("request_id"), str):
+        return data["request_id"]
+    return ""
+
+
+def _parse_index_list(raw: str) -> List[int]:
+    try:
+        return [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError as exc:
+        raise ValueError(f"Invalid index list: {raw}") from exc
+
+
+async def _subscribe_meters(strips: str, buses: str, fps: float, peak_hold_ms: int) -> meters.MeterSubscription:
+    loop = asyncio.get_running_loop()
+    return await run_in_threadpool(
+        meters.subscribe,
+        loop,
+        _parse_index_list(strips),
+        _parse_index_list(buses),
+        fps,
+        peak_hold_ms,
+    )
+
+
+@app.websocket("/meters/ws")
+async def meters_socket(
+    websocket: WebSocket,
+    strips: str = "",
+    buses: str = "",
+    fps: float = 30.0,
+    peak_hold_ms: int = 0,
+) -> None:
+    try:
+        check_bearer(websocket.headers.get("authorization"))
+    except HTTPException:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    try:
+        sub = await _subscribe_meters(strips, buses, fps, peak_hold_ms)
+    except Exception as exc:
+        await websocket.send_json({"type": "error", "error": str(exc)})
+        await websocket.close(code=1008)
+        return
+
+    async def drain_client() -> None:
+        while True:
+            await websocket.receive()
+
+    drain_task = asyncio.create_task(drain_client())
+    get_task: asyncio.Task | None = None
+    try:
+        await websocket.send_json(sub.layout())
+        # Wait on the client too: with Voicemeeter down no frames arrive, and a closed
+        # socket must still release its subscriber slot.
+        while True:
+            get_task = asyncio.create_task(sub.queue.get())
+            await asyncio.wait((get_task, drain_task), return_when=asyncio.FIRST_COMPLETED)
+            if not get_task.done():
+                break
+            await websocket.send_bytes(get_task.result())
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        if get_task is not None:
+            get_task.cancel()
+        drain_task.cancel()
+        meters.unsubscribe(sub)
+
+
+@app.get("/meters/sse")
+async def meters_events(
+    strips: str = "",
+    buses: str = "",
+    fps: float = 30.0,
+    peak_hold_ms: int = 0,
+    _auth: None = Depends(verify_bearer),
+) -> StreamingResponse:
+    try:
+        sub = await _subscribe_meters(strips, buses, fps, peak_hold_ms)
+    except Exception as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    async def stream():
+        try:
+            yield f"event: layout\ndata: {json.dumps(sub.layout())}\n\n"
+            while True:
+                frame = await sub.queue.get()
+                yield f"data: {base64.b64encode(frame).decode('ascii')}\n\n"
+        finally:
+            meters.unsubscribe(sub)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
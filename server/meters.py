@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Set, Tuple
+
+from . import allowlist, voicemeeter
+from .config import (
+    METERS_BASE_FPS,
+    METERS_MAX_PEAK_HOLD_MS,
+    METERS_MAX_SUBSCRIBERS,
+    METERS_QUEUE_FRAMES,
+)
+
+FRAME_HEADER = struct.Struct("<II")
+FLAG_PEAKS = 0x1
+PEAK_RELEASE_DB_PER_SECOND = 20.0
+
+
+class MeterSubscription:
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        targets: List[str],
+        channels: Dict[str, Tuple[int, int]],
+        fps: float,
+        peak_hold_ms: int,
+    ) -> None:
+        self.loop = loop
+        self.targets = targets
+        self.indices: List[int] = []
+        self.layout_channels: List[Dict[str, Any]] = []
+        for target in targets:
+            start, end = channels[target]
+            for offset, idx in enumerate(range(start, end)):
+                self.indices.append(idx)
+                self.layout_channels.append({"target": target, "channel": offset})
+        self.every = max(1, round(METERS_BASE_FPS / min(float(fps), float(METERS_BASE_FPS))))
+        # Frames go out every Nth producer tick, so this is the rate clients actually see.
+        self.fps = round(METERS_BASE_FPS / self.every, 3)
+        self.peak_hold_s = peak_hold_ms / 1000.0
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=METERS_QUEUE_FRAMES)
+        self.dropped = 0
+        count = len(self.indices)
+        self._window = [voicemeeter.LEVEL_FLOOR_DB] * count
+        self._peaks = [voicemeeter.LEVEL_FLOOR_DB] * count
+        self._peak_at = [0.0] * count
+        self._ticks = 0
+
+    def layout(self) -> Dict[str, Any]:
+        return {
+            "type": "layout",
+            "fps": self.fps,
+            "peak_hold_ms": int(self.peak_hold_s * 1000),
+            "channels": self.layout_channels,
+            "frame": "<u32 seq><u32 flags><f32 levels[n]>[<f32 peaks[n]> if flags & 1], little-endian, dB",
+        }
+
+    def feed(self, seq: int, levels: Dict[int, float], now: float) -> bytes | None:
+        window = self._window
+        for pos, idx in enumerate(self.indices):
+            value = levels[idx]
+            if value > window[pos]:
+                window[pos] = value
+        self._ticks += 1
+        if self._ticks < self.every:
+            return None
+        self._ticks = 0
+
+        flags = 0
+        payload = array("f", window)
+        if self.peak_hold_s > 0:
+            flags |= FLAG_PEAKS
+            peaks = self._peaks
+            for pos, value in enumerate(window):
+                held_for = now - self._peak_at[pos]
+                if held_for > self.peak_hold_s:
+                    peaks[pos] -= PEAK_RELEASE_DB_PER_SECOND * (held_for - self.peak_hold_s)
+                    self._peak_at[pos] = now - self.peak_hold_s
+                if value >= peaks[pos]:
+                    peaks[pos] = value
+                    self._peak_at[pos] = now
+            payload.extend(peaks)
+        self._window = [voicemeeter.LEVEL_FLOOR_DB] * len(window)
+        return FRAME_HEADER.pack(seq & 0xFFFFFFFF, flags) + payload.tobytes()
+
+    def offer(self, frame: bytes) -> None:
+        self.loop.call_soon_threadsafe(self._offer, frame)
+
+    def _offer(self, frame: bytes) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+
+_LOCK = threading.Lock()
+_SUBSCRIBERS: Set[MeterSubscription] = set()
+# Sorted union of the subscribers' channel indices: the producer reads only these.
+_INDICES: List[int] = []
+_CHANNELS: Dict[str, Tuple[int, int]] | None = None
+_STOP = threading.Event()
+_THREAD: threading.Thread | None = None
+
+
+def _resolve_targets(strips: List[int], buses: List[int]) -> List[str]:
+    index = allowlist.INDEX
+    targets: List[str] = []
+    for idx in strips:
+        if idx not in index.strips:
+            raise ValueError(f"Strip not allowed: strip-{idx}")
+        targets.append(f"strip-{idx}")
+    for idx in buses:
+        if idx not in index.buses:
+            raise ValueError(f"Bus not allowed: bus-{idx}")
+        targets.append(f"bus-{idx}")
+    if not targets:
+        raise ValueError("Select at least one strip or bus")
+    return targets
+
+
+def subscribe(
+    loop: asyncio.AbstractEventLoop,
+    strips: List[int],
+    buses: List[int],
+    fps: float,
+    peak_hold_ms: int,
+) -> MeterSubscription:
+    global _CHANNELS
+    if fps <= 0:
+        raise ValueError("fps must be positive")
+    if peak_hold_ms < 0 or peak_hold_ms > METERS_MAX_PEAK_HOLD_MS:
+        raise ValueError(f"peak_hold_ms must be between 0 and {METERS_MAX_PEAK_HOLD_MS}")
+    targets = _resolve_targets(strips, buses)
+    # Recomputed when a reloaded allowlist adds strips or buses.
+    if _CHANNELS is None or any(target not in _CHANNELS for target in targets):
+        _CHANNELS = voicemeeter.level_channels()
+    sub = MeterSubscription(loop, targets, _CHANNELS, fps, peak_hold_ms)
+    with _LOCK:
+        if len(_SUBSCRIBERS) >= METERS_MAX_SUBSCRIBERS:
+            raise ValueError("Too many meter subscribers")
+        _SUBSCRIBERS.add(sub)
+        _update_indices_locked()
+        _ensure_producer()
+    return sub
+
+
+def unsubscribe(sub: MeterSubscription) -> None:
+    with _LOCK:
+        _SUBSCRIBERS.discard(sub)
+        _update_indices_locked()
+
+
+def _update_indices_locked() -> None:
+    global _INDICES
+    _INDICES = sorted({idx for sub in _SUBSCRIBERS for idx in sub.indices})
+
+
+def _ensure_producer() -> None:
+    global _THREAD
+    if _THREAD is not None and _THREAD.is_alive():
+        return
+    _STOP.clear()
+    _THREAD = threading.Thread(target=_produce, name="vm-meters", daemon=True)
+    _THREAD.start()
+
+
+def _produce() -> None:
+    global _THREAD
+    logger = logging.getLogger("agent")
+    interval = 1.0 / METERS_BASE_FPS
+    seq = 0
+    next_tick = time.monotonic()
+    while not _STOP.is_set():
+        with _LOCK:
+            subscribers = list(_SUBSCRIBERS)
+            indices = _INDICES
+            if not subscribers:
+                _THREAD = None
+                return
+        try:
+            levels = voicemeeter.read_levels(indices)
+        except Exception as exc:
+            logger.warning(
+                "meters_error",
+                extra={"extra": {"event": "meters_error", "error": str(exc)}},
+            )
+            _STOP.wait(1.0)
+            next_tick = time.monotonic()
+            continue
+        seq += 1
+        now = time.monotonic()
+        for sub in subscribers:
+            frame = sub.feed(seq, levels, now)
+            if frame is None:
+                continue
+            try:
+                sub.offer(frame)
+            except RuntimeError:
+                unsubscribe(sub)
+        next_tick += interval
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            _STOP.wait(delay)
+        else:
+            next_tick = time.monotonic()
+
+
+def stop() -> None:
+    global _THREAD
+    _STOP.set()
+    thread = _THREAD
+    if thread is not None:
+        thread.join(timeout=2.0)
+    _THREAD = None
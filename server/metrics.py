@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Series are plain numbers updated under the GIL: no locks on the hot path, at the
+# cost of very rarely losing an increment under heavy thread contention.
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _sample(value: float) -> str:
+    # Exact text: ":g" keeps 6 significant digits, so busy counters would appear to stall.
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        try:
+            self._values[labels] += amount
+        except KeyError:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_sample(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.buckets = buckets
+        # Per label set: [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(labels, [0.0] * (len(self.buckets) + 2))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bounds = [f'le="{bound:g}"' for bound in self.buckets] + ['le="+Inf"']
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0.0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, bound)} {_sample(cumulative)}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_sample(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {_sample(cumulative)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, read: Callable[[], Iterable[Tuple[Dict[str, str], float]]]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        for labels, value in self.read():
+            names = tuple(labels)
+            lines.append(f"{self.name}{_labels(names, tuple(labels[n] for n in names))} {_sample(value)}")
+        return lines
+
+
+COMMANDS = Counter("agent_commands_total", "Commands handled, by action.", ("action",))
+COMMAND_ERRORS = Counter("agent_command_errors_total", "Commands that returned an error, by action.", ("action",))
+COMMAND_LATENCY = Histogram(
+    "agent_command_duration_seconds", "Command latency from parse to result, by action.", ("action",)
+)
+VM_LOCK_WAIT = Histogram("agent_vm_lock_wait_seconds", "Time spent waiting to acquire _VM_LOCK.")
+VM_LOCK_HOLD = Histogram("agent_vm_lock_hold_seconds", "Time _VM_LOCK was held.")
+VM_CALLS = Counter("agent_vm_dll_calls_total", "Voicemeeter remote API calls, by operation.", ("op",))
+VM_LOGINS = Counter("agent_vm_logins_total", "Voicemeeter logins.")
+VM_RECONNECTS = Counter("agent_vm_reconnects_total", "Voicemeeter re-logins after a session was lost or closed.")
+VM_COALESCE_FAILURES = Counter("agent_vm_coalesce_failures_total", "Coalesced write flushes that raised.")
+PROCESS_LAUNCHES = Counter("agent_process_launches_total", "Allowlisted app launches, by app.", ("app",))
+REPLAY = Counter(
+    "agent_replay_lookups_total", "request_id replay cache lookups: hit, joined, miss or conflict.", ("result",)
+)
+ADMISSION_REJECTED = Counter(
+    "agent_admission_rejected_total", "Commands rejected with 429, by priority class and reason.", ("class", "reason")
+)
+
+_REGISTRY: List[Counter | Histogram | Gauge] = [
+    COMMANDS,
+    COMMAND_ERRORS,
+    COMMAND_LATENCY,
+    VM_LOCK_WAIT,
+    VM_LOCK_HOLD,
+    VM_CALLS,
+    VM_LOGINS,
+    VM_RECONNECTS,
+    VM_COALESCE_FAILURES,
+    PROCESS_LAUNCHES,
+    REPLAY,
+    ADMISSION_REJECTED,
+]
+
+
+def register(metric: Counter | Histogram | Gauge) -> None:
+    _REGISTRY.append(metric)
+
+
+def observe_command(action: str, seconds: float, ok: bool) -> None:
+    COMMANDS.inc(action)
+    if not ok:
+        COMMAND_ERRORS.inc(action)
+    COMMAND_LATENCY.observe(seconds, action)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
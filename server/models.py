@@ -1,21 +1,14 @@
 from __future__ import annotations
 
 from typing import Any, Dict, List, Literal, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
-class CommandRequest(BaseModel):
+class CommandBase(BaseModel):
+    # Per-action subclasses with a Literal "action" and a typed "payload" are built in actions.py.
     request_id: str = Field(..., min_length=1)
-    action: Literal[
-        "run_app",
-        "key_press",
-        "voicemeeter_apply",
-        "voicemeeter_group_bus_gain",
-        "voicemeeter_command",
-        "voicemeeter_get",
-        "voicemeeter_set",
-    ]
-    payload: Dict[str, Any]
+    action: str
+    payload: BaseModel
 
 
 class CommandResponse(BaseModel):
@@ -25,17 +18,44 @@ class CommandResponse(BaseModel):
     error: Optional[str] = None
 
 
+class BatchCommandRequest(BaseModel):
+    # Items are parsed one by one (actions.parse_command) so a bad payload fails only its item.
+    commands: List[Dict[str, Any]] = Field(..., min_length=1)
+    mode: Literal["stop_on_error", "continue"] = "stop_on_error"
+
+
+class BatchCommandResponse(BaseModel):
+    ok: bool
+    results: List[CommandResponse]
+
+
 class RunAppPayload(BaseModel):
     app: str
     args: Optional[List[str]] = None
 
 
+class ProcessStatusPayload(BaseModel):
+    app: Optional[str] = None
+    running_only: bool = False
+
+
 class KeyPressPayload(BaseModel):
     keys: List[str]
 
 
+class KeyChord(BaseModel):
+    keys: List[str]
+    delay_ms: Optional[int] = None
+
+
+class KeySequencePayload(BaseModel):
+    chords: List[KeyChord]
+    delay_ms: int = 0
+
+
 class VoicemeeterApplyPayload(BaseModel):
     settings: Dict[str, Dict[str, Any]]
+    coalesce: Optional[Literal["queued", "applied"]] = None
 
 
 class VoicemeeterGroupBusGainPayload(BaseModel):
@@ -55,6 +75,7 @@ class VoicemeeterGetPayload(BaseModel):
     targets: Optional[List[str]] = None
     fields: Optional[List[str]] = None
     params: Optional[List[VoicemeeterParamGet]] = None
+    live: Optional[bool] = False
 
 
 class VoicemeeterParamSet(BaseModel):
@@ -64,3 +85,28 @@ class VoicemeeterParamSet(BaseModel):
 
 class VoicemeeterSetPayload(BaseModel):
     params: List[VoicemeeterParamSet]
+    coalesce: Optional[Literal["queued", "applied"]] = None
+
+
+# The original curve names, kept so existing clients still validate.
+_RAMP_CURVE_ALIASES = {"linear": "amplitude", "exponential": "db"}
+
+
+class VoicemeeterRampPayload(BaseModel):
+    targets: List[str]
+    gain: float
+    duration_ms: int
+    curve: Literal["amplitude", "db"] = Field(
+        "amplitude",
+        description="Interpolation: 'amplitude' is linear in amplitude, 'db' is linear in dB. "
+        "'linear' and 'exponential' are accepted as deprecated aliases.",
+    )
+
+    @field_validator("curve", mode="before")
+    @classmethod
+    def _curve_alias(cls, value: Any) -> Any:
+        return _RAMP_CURVE_ALIASES.get(value, value) if isinstance(value, str) else value
+
+
+class VoicemeeterSnapshotPayload(BaseModel):
+    name: str
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+from . import voicemeeter
+from .config import (
+    VOICEMEETER_GAIN_MAX,
+    VOICEMEETER_GAIN_MIN,
+    VOICEMEETER_RAMP_MAX_MS,
+    VOICEMEETER_RAMP_TICK_HZ,
+)
+
+CURVES = ("amplitude", "db")
+
+
+@dataclass
+class _Ramp:
+    start_gain: float
+    end_gain: float
+    started_at: float
+    duration_s: float
+    curve: str
+
+    def value_at(self, now: float) -> float:
+        if self.duration_s <= 0:
+            return self.end_gain
+        progress = min(1.0, max(0.0, (now - self.started_at) / self.duration_s))
+        if self.curve == "db":
+            value = self.start_gain + (self.end_gain - self.start_gain) * progress
+        else:
+            start_amp = 10 ** (self.start_gain / 20.0)
+            end_amp = 10 ** (self.end_gain / 20.0)
+            amp = start_amp + (end_amp - start_amp) * progress
+            value = 20.0 * math.log10(amp) if amp > 0 else VOICEMEETER_GAIN_MIN
+        return min(VOICEMEETER_GAIN_MAX, max(VOICEMEETER_GAIN_MIN, round(value, 2)))
+
+    def done(self, now: float) -> bool:
+        return now - self.started_at >= self.duration_s
+
+
+_LOCK = threading.Lock()
+_RAMPS: Dict[str, _Ramp] = {}
+_STOP = threading.Event()
+_WAKE = threading.Event()
+_THREAD: threading.Thread | None = None
+
+
+def validate_ramp(targets: List[str], gain: float, duration_ms: int, curve: str) -> None:
+    if not targets:
+        raise ValueError("Targets must not be empty")
+    if curve not in CURVES:
+        raise ValueError(f"Unknown curve: {curve}")
+    if duration_ms < 0 or duration_ms > VOICEMEETER_RAMP_MAX_MS:
+        raise ValueError(f"duration_ms must be between 0 and {VOICEMEETER_RAMP_MAX_MS}")
+    voicemeeter.prepare_settings({target: {"gain": gain} for target in targets})
+
+
+def start_ramp(targets: List[str], gain: float, duration_ms: int, curve: str) -> Dict[str, object]:
+    validate_ramp(targets, gain, duration_ms, curve)
+    now = time.monotonic()
+    with _LOCK:
+        pending = [target for target in targets if target not in _RAMPS]
+    current: Dict[str, float] = {}
+    if pending:
+        values, _ = voicemeeter.get_targets_fields(pending, ["gain"])
+        current = {target: float(values[target]["gain"]) for target in pending}
+
+    with _LOCK:
+        replaced = []
+        for target in targets:
+            active = _RAMPS.get(target)
+            if active is not None:
+                replaced.append(target)
+                start_gain = active.value_at(now)
+            else:
+                start_gain = current.get(target, float(gain))
+            _RAMPS[target] = _Ramp(
+                start_gain=min(VOICEMEETER_GAIN_MAX, max(VOICEMEETER_GAIN_MIN, start_gain)),
+                end_gain=float(gain),
+                started_at=now,
+                duration_s=duration_ms / 1000.0,
+                curve=curve,
+            )
+        _ensure_scheduler()
+    _WAKE.set()
+    return {
+        "ramping": list(targets),
+        "gain": gain,
+        "duration_ms": duration_ms,
+        "curve": curve,
+        "replaced": replaced,
+    }
+
+
+def cancel(targets: List[str]) -> List[str]:
+    with _LOCK:
+        return [target for target in targets if _RAMPS.pop(target, None) is not None]
+
+
+def active_ramps() -> Dict[str, float]:
+    now = time.monotonic()
+    with _LOCK:
+        return {target: ramp.value_at(now) for target, ramp in _RAMPS.items()}
+
+
+def _ensure_scheduler() -> None:
+    global _THREAD
+    if _THREAD is not None and _THREAD.is_alive():
+        return
+    _STOP.clear()
+    _THREAD = threading.Thread(target=_run_scheduler, name="vm-ramps", daemon=True)
+    _THREAD.start()
+
+
+def _run_scheduler() -> None:
+    global _THREAD
+    logger = logging.getLogger("agent")
+    interval = 1.0 / VOICEMEETER_RAMP_TICK_HZ
+    while not _STOP.is_set():
+        tick_started = time.monotonic()
+        with _LOCK:
+            if not _RAMPS:
+                _THREAD = None
+                return
+            settings = {target: {"gain": ramp.value_at(tick_started)} for target, ramp in _RAMPS.items()}
+            finished = [target for target, ramp in _RAMPS.items() if ramp.done(tick_started)]
+        try:
+            voicemeeter.apply_prepared_settings([settings])
+        except Exception as exc:
+            logger.error(
+                "ramp_error",
+                extra={"extra": {"event": "ramp_error", "targets": sorted(settings), "error": str(exc)}},
+            )
+            with _LOCK:
+                _RAMPS.clear()
+            continue
+        with _LOCK:
+            for target in finished:
+                ramp = _RAMPS.get(target)
+                if ramp is not None and ramp.done(tick_started):
+                    del _RAMPS[target]
+        _WAKE.clear()
+        _WAKE.wait(max(0.0, interval - (time.monotonic() - tick_started)))
+
+
+def stop() -> None:
+    global _THREAD
+    _STOP.set()
+    _WAKE.set()
+    thread = _THREAD
+    if thread is not None:
+        thread.join(timeout=2.0)
+    _THREAD = None
+    with _LOCK:
+        _RAMPS.clear()
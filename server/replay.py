@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from . import metrics
+from .config import REPLAY_CACHE_SIZE, REPLAY_CACHE_TTL_SECONDS
+from .models import CommandBase, CommandResponse
+
+# Outcomes worth retrying (rate limited, lane full, Voicemeeter down) are not remembered.
+_TRANSIENT_STATUS = {429, 503}
+
+_Outcome = Tuple[CommandResponse, int]
+
+
+class Entry:
+    __slots__ = ("key", "action", "payload", "future", "expires_at")
+
+    def __init__(self, key: Tuple[str, str], req: CommandBase, future: asyncio.Future) -> None:
+        self.key = key
+        self.action = req.action
+        self.payload = req.payload
+        self.future = future
+        self.expires_at = float("inf")
+
+
+# Only touched from the event loop thread, so no lock is needed.
+_ENTRIES: "OrderedDict[Tuple[str, str], Entry]" = OrderedDict()
+
+
+def _evict(now: float) -> None:
+    while _ENTRIES:
+        key, entry = next(iter(_ENTRIES.items()))
+        if len(_ENTRIES) <= REPLAY_CACHE_SIZE and entry.expires_at > now:
+            break
+        del _ENTRIES[key]
+
+
+async def claim(req: CommandBase, caller: str) -> Tuple[_Outcome | None, Entry | None, str]:
+    # Either a stored/shared outcome, or an entry the caller now owns and must finish() or abandon().
+    key = (caller, req.request_id)
+    while True:
+        now = time.monotonic()
+        entry = _ENTRIES.get(key)
+        if entry is not None and entry.expires_at <= now:
+            del _ENTRIES[key]
+            entry = None
+        if entry is None:
+            break
+        if entry.action != req.action or entry.payload != req.payload:
+            metrics.REPLAY.inc("conflict")
+            error = f"request_id {req.request_id} was already used for a different command"
+            return (CommandResponse(request_id=req.request_id, ok=False, error=error), 409), None, "conflict"
+        _ENTRIES.move_to_end(key)
+        kind = "hit" if entry.future.done() else "joined"
+        metrics.REPLAY.inc(kind)
+        try:
+            return await asyncio.shield(entry.future), None, kind
+        except asyncio.CancelledError:
+            # The original caller went away before finishing; run it ourselves.
+            if not entry.future.cancelled():
+                raise
+
+    metrics.REPLAY.inc("miss")
+    entry = Entry(key, req, asyncio.get_running_loop().create_future())
+    _ENTRIES[key] = entry
+    _evict(now)
+    return None, entry, "miss"
+
+
+def finish(entry: Entry, outcome: _Outcome) -> None:
+    if outcome[1] in _TRANSIENT_STATUS:
+        if _ENTRIES.get(entry.key) is entry:
+            del _ENTRIES[entry.key]
+    else:
+        entry.expires_at = time.monotonic() + REPLAY_CACHE_TTL_SECONDS
+    entry.future.set_result(outcome)
+
+
+def abandon(entry: Entry) -> None:
+    if _ENTRIES.get(entry.key) is entry:
+        del _ENTRIES[entry.key]
+    entry.future.cancel()
+
+
+async def run_once(
+    req: CommandBase, caller: str, execute: Callable[[CommandBase], Awaitable[_Outcome]]
+) -> Tuple[_Outcome, str]:
+    outcome, entry, kind = await claim(req, caller)
+    if entry is None:
+        return outcome, kind
+    try:
+        outcome = await execute(req)
+    except BaseException:
+        abandon(entry)
+        raise
+    finish(entry, outcome)
+    return outcome, kind
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "size": len(_ENTRIES),
+        "capacity": REPLAY_CACHE_SIZE,
+        "ttl_seconds": REPLAY_CACHE_TTL_SECONDS,
+        "hits": int(metrics.REPLAY.value("hit")),
+        "joined": int(metrics.REPLAY.value("joined")),
+        "misses": int(metrics.REPLAY.value("miss")),
+        "conflicts": int(metrics.REPLAY.value("conflict")),
+    }
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from . import allowlist, ramps, voicemeeter
+from .config import (
+    APPDATA_SNAPSHOT_DIR,
+    VOICEMEETER_SNAPSHOT_MAX_COUNT,
+    VOICEMEETER_SNAPSHOT_NAME_PATTERN,
+)
+
+# On disk: {"v": 1, "saved_at": <unix ts>, "fields": ["gain", "mute"],
+#           "targets": {"strip-0": [-6.0, false], ...}} with values in "fields" order.
+FORMAT_VERSION = 1
+
+_NAME_RE = re.compile(VOICEMEETER_SNAPSHOT_NAME_PATTERN)
+_LOCK = threading.Lock()
+# name -> ((mtime_ns, size), settings) so repeated restores skip the file parse.
+_CACHE: Dict[str, Tuple[Tuple[int, int], Dict[str, Dict[str, Any]]]] = {}
+
+
+def _path(name: str) -> Path:
+    if not isinstance(name, str) or not _NAME_RE.fullmatch(name):
+        raise ValueError(f"Invalid snapshot name: {name}")
+    return APPDATA_SNAPSHOT_DIR / f"{name}.json"
+
+
+def validate_name(name: str) -> None:
+    _path(name)
+
+
+def validate_restore(name: str) -> None:
+    if not _path(name).exists():
+        raise ValueError(f"Unknown snapshot: {name}")
+
+
+def _encode(settings: Dict[str, Dict[str, Any]]) -> str:
+    fields = sorted({field for values in settings.values() for field in values})
+    doc = {
+        "v": FORMAT_VERSION,
+        "saved_at": round(time.time(), 3),
+        "fields": fields,
+        "targets": {target: [values.get(field) for field in fields] for target, values in settings.items()},
+    }
+    return json.dumps(doc, separators=(",", ":"))
+
+
+def _decode(raw: bytes) -> Dict[str, Dict[str, Any]]:
+    doc = json.loads(raw)
+    if not isinstance(doc, dict) or doc.get("v") != FORMAT_VERSION:
+        raise ValueError("Unsupported snapshot format")
+    fields = doc.get("fields")
+    targets = doc.get("targets")
+    if not isinstance(fields, list) or not isinstance(targets, dict):
+        raise ValueError("Unsupported snapshot format")
+    settings: Dict[str, Dict[str, Any]] = {}
+    for target, values in targets.items():
+        if not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError(f"Corrupt snapshot entry: {target}")
+        settings[target] = {field: value for field, value in zip(fields, values) if value is not None}
+    return settings
+
+
+def save(name: str) -> Dict[str, Any]:
+    path = _path(name)
+    settings = voicemeeter.capture_fields()
+    data = _encode(settings)
+    with _LOCK:
+        APPDATA_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        if not path.exists() and len(list(APPDATA_SNAPSHOT_DIR.glob("*.json"))) >= VOICEMEETER_SNAPSHOT_MAX_COUNT:
+            raise ValueError(f"Snapshot limit reached ({VOICEMEETER_SNAPSHOT_MAX_COUNT})")
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, path)
+        stat = path.stat()
+        _CACHE[name] = ((stat.st_mtime_ns, stat.st_size), settings)
+    return {"name": name, "targets": len(settings), "bytes": len(data)}
+
+
+def _load(name: str) -> Dict[str, Dict[str, Any]]:
+    path = _path(name)
+    with _LOCK:
+        try:
+            with path.open("rb") as handle:
+                stat = os.fstat(handle.fileno())
+                key = (stat.st_mtime_ns, stat.st_size)
+                cached = _CACHE.get(name)
+                if cached is not None and cached[0] == key:
+                    return cached[1]
+                settings = _decode(handle.read())
+        except FileNotFoundError:
+            raise ValueError(f"Unknown snapshot: {name}") from None
+        _CACHE[name] = (key, settings)
+        return settings
+
+
+def restore(name: str) -> Dict[str, Any]:
+    stored = _load(name)
+    index = allowlist.INDEX
+    settings: Dict[str, Dict[str, Any]] = {}
+    skipped: List[str] = []
+    for target, fields in stored.items():
+        allowed = {field: value for field, value in fields.items() if not index.field_error(field)}
+        if index.target_error(target) or not allowed:
+            skipped.append(target)
+            continue
+        settings[target] = allowed
+    if not settings:
+        raise ValueError(f"Snapshot has no allowlisted targets: {name}")
+    # A running fade would overwrite the restored gain on its next tick.
+    cancelled = ramps.cancel(list(settings))
+    changes = voicemeeter.apply_diff(settings)
+    return {
+        "name": name,
+        "changed": {target: sorted(fields) for target, fields in changes.items()},
+        "unchanged": len(settings) - len(changes),
+        "skipped": skipped,
+        "ramps_cancelled": cancelled,
+    }
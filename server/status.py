@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from .config import (
+    STATUS_ERROR_MIN_COMMANDS,
+    STATUS_ERROR_RATE_THRESHOLD,
+    STATUS_ERROR_WINDOW_SECONDS,
+    STATUS_QUEUE_EVENTS,
+)
+
+
+class StatusSubscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.queue: asyncio.Queue[Dict[str, Any]] = asyncio.Queue(maxsize=STATUS_QUEUE_EVENTS)
+
+    def _offer(self, snapshot: Dict[str, Any]) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(snapshot)
+
+
+_LOCK = threading.Lock()
+_STATE: Dict[str, str] = {"server": "running", "voicemeeter": "disconnected", "errors": "normal"}
+_DETAIL: Dict[str, Any] = {"voicemeeter_error": None}
+_SEQ = 0
+_CHANGED_AT = time.time()
+_SUBSCRIBERS: Set[StatusSubscription] = set()
+
+# Ring of per-second (second, commands, errors) slots covering the error window.
+_SLOT_SECOND: List[int] = [-1] * STATUS_ERROR_WINDOW_SECONDS
+_SLOT_COMMANDS: List[int] = [0] * STATUS_ERROR_WINDOW_SECONDS
+_SLOT_ERRORS: List[int] = [0] * STATUS_ERROR_WINDOW_SECONDS
+
+
+def _window_totals_locked(now_second: int) -> Tuple[int, int]:
+    oldest = now_second - STATUS_ERROR_WINDOW_SECONDS
+    commands = errors = 0
+    for slot, second in enumerate(_SLOT_SECOND):
+        if second > oldest:
+            commands += _SLOT_COMMANDS[slot]
+            errors += _SLOT_ERRORS[slot]
+    return commands, errors
+
+
+def _snapshot_locked() -> Dict[str, Any]:
+    commands, errors = _window_totals_locked(int(time.monotonic()))
+    return {
+        "seq": _SEQ,
+        "changed_at": _CHANGED_AT,
+        "healthy": _STATE["server"] == "running"
+        and _STATE["voicemeeter"] != "error"
+        and _STATE["errors"] == "normal",
+        **_STATE,
+        **_DETAIL,
+        "window_seconds": STATUS_ERROR_WINDOW_SECONDS,
+        "window_commands": commands,
+        "window_errors": errors,
+    }
+
+
+def _update_locked(**changes: str) -> None:
+    global _SEQ, _CHANGED_AT
+    if all(_STATE.get(key) == value for key, value in changes.items()):
+        return
+    _STATE.update(changes)
+    _SEQ += 1
+    _CHANGED_AT = time.time()
+    snapshot = _snapshot_locked()
+    for sub in list(_SUBSCRIBERS):
+        try:
+            sub.loop.call_soon_threadsafe(sub._offer, snapshot)
+        except RuntimeError:
+            _SUBSCRIBERS.discard(sub)
+
+
+def _evaluate_errors_locked(now_second: int) -> None:
+    commands, errors = _window_totals_locked(now_second)
+    elevated = commands >= STATUS_ERROR_MIN_COMMANDS and errors / commands >= STATUS_ERROR_RATE_THRESHOLD
+    _update_locked(errors="elevated" if elevated else "normal")
+
+
+def record_command(ok: bool) -> None:
+    second = int(time.monotonic())
+    slot = second % STATUS_ERROR_WINDOW_SECONDS
+    with _LOCK:
+        if _SLOT_SECOND[slot] != second:
+            _SLOT_SECOND[slot] = second
+            _SLOT_COMMANDS[slot] = 0
+            _SLOT_ERRORS[slot] = 0
+        _SLOT_COMMANDS[slot] += 1
+        if not ok:
+            _SLOT_ERRORS[slot] += 1
+        _evaluate_errors_locked(second)
+
+
+def refresh() -> None:
+    with _LOCK:
+        _evaluate_errors_locked(int(time.monotonic()))
+
+
+def set_voicemeeter(state: str, error: str | None = None) -> None:
+    if _STATE["voicemeeter"] == state and _DETAIL["voicemeeter_error"] == error:
+        return
+    with _LOCK:
+        _DETAIL["voicemeeter_error"] = error
+        _update_locked(voicemeeter=state)
+
+
+def set_server(state: str) -> None:
+    with _LOCK:
+        _update_locked(server=state)
+
+
+def snapshot() -> Dict[str, Any]:
+    with _LOCK:
+        return _snapshot_locked()
+
+
+def subscribe(loop: asyncio.AbstractEventLoop) -> StatusSubscription:
+    sub = StatusSubscription(loop)
+    with _LOCK:
+        _SUBSCRIBERS.add(sub)
+        sub.queue.put_nowait(_snapshot_locked())
+    return sub
+
+
+def unsubscribe(sub: StatusSubscription) -> None:
+    with _LOCK:
+        _SUBSCRIBERS.discard(sub)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator
+
+from .config import TRACE_SAMPLE_RATE, TRACE_SLOW_MS
+
+
+class Trace:
+    __slots__ = ("started", "spans", "request_id", "action")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        # Phase name -> seconds, in first-seen order; a phase entered twice accumulates.
+        self.spans: Dict[str, float] = {}
+        self.request_id: str | None = None
+        self.action: str | None = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+# Lane workers run each job in the submitting request's context, so spans recorded
+# there (queue wait, Voicemeeter lock and calls) land on the same trace.
+_CURRENT: ContextVar[Trace | None] = ContextVar("agent_trace", default=None)
+
+
+def start() -> Trace:
+    trace = Trace()
+    _CURRENT.set(trace)
+    return trace
+
+
+def current() -> Trace | None:
+    return _CURRENT.get()
+
+
+def record(name: str, seconds: float) -> None:
+    trace = _CURRENT.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    trace = _CURRENT.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - started)
+
+
+def server_timing(trace: Trace, total: float) -> str:
+    parts = [f"{name};dur={seconds * 1000.0:.3f}" for name, seconds in trace.spans.items()]
+    parts.append(f"total;dur={total * 1000.0:.3f}")
+    return ", ".join(parts)
+
+
+def finish(trace: Trace, path: str, status_code: int) -> float:
+    total = time.perf_counter() - trace.started
+    total_ms = total * 1000.0
+    slow = total_ms >= TRACE_SLOW_MS
+    if slow or (TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE):
+        extra: Dict[str, Any] = {
+            "event": "trace",
+            "path": path,
+            "request_id": trace.request_id,
+            "action": trace.action,
+            "status": status_code,
+            "slow": slow,
+            "total_ms": round(total_ms, 3),
+            "spans_ms": {name: round(seconds * 1000.0, 3) for name, seconds in trace.spans.items()},
+        }
+        logging.getLogger("agent").log(logging.WARNING if slow else logging.INFO, "trace", extra={"extra": extra})
+    return total
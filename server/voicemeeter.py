@@ -1,90 +1,423 @@
 from __future__ import annotations
 
-import re
+import asyncio
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
 from threading import Lock
-from typing import Any, Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
+from . import allowlist, metrics, status, tracing
 from .config import (
-    VOICEMEETER_ALLOWED_BUSES,
-    VOICEMEETER_ALLOWED_COMMANDS,
-    VOICEMEETER_ALLOWED_FIELD_PATTERNS,
-    VOICEMEETER_ALLOWED_PARAM_PATTERNS,
-    VOICEMEETER_ALLOWED_STRIPS,
-    VOICEMEETER_ALLOWED_TARGET_PATTERNS,
+    VOICEMEETER_COALESCE_WAIT_SECONDS,
+    VOICEMEETER_COALESCE_WINDOW_MS,
     VOICEMEETER_GAIN_MAX,
     VOICEMEETER_GAIN_MIN,
     VOICEMEETER_GROUP_BUS_IDS,
     VOICEMEETER_KIND,
+    VOICEMEETER_METER_STRIP_MODE,
+    VOICEMEETER_MIRROR_ENABLED,
+    VOICEMEETER_MIRROR_MAX_PARAMS,
+    VOICEMEETER_MIRROR_POLL_SECONDS,
+    VOICEMEETER_RECONNECT_BACKOFF_MAX_SECONDS,
+    VOICEMEETER_RECONNECT_BACKOFF_MIN_SECONDS,
+    VOICEMEETER_SUPERVISOR_INTERVAL_SECONDS,
+    VOICEMEETER_SUPERVISOR_LOCK_TIMEOUT_SECONDS,
 )
 
-try:
-    import voicemeeterlib
-except Exception as exc:  # pragma: no cover - import error path
-    voicemeeterlib = None
-    _IMPORT_ERROR = exc
-else:
-    _IMPORT_ERROR = None
+# voicemeeterlib is imported on first use (or by warm_up) to keep server import fast.
+voicemeeterlib: Any = None
+_IMPORT_ERROR: Exception | None = None
+IMPORT_MS: float | None = None
+LOGIN_MS: float | None = None
 
 
 _VM_LOCK = Lock()
 _VM_CLIENT = None
 _VM_LOGGED_IN = False
 
+# Connection supervisor / circuit breaker: written with _VM_LOCK held, read
+# without it so requests can fail fast while Voicemeeter is unavailable.
+_BREAKER_OPEN = False
+_BREAKER_ERROR: str | None = None
+_BREAKER_RETRY_AT = 0.0
+_CONNECT_FAILURES = 0
+_CONN_CHANGED_AT = time.time()
+_SUPERVISOR_STOP = threading.Event()
+_SUPERVISOR_WAKE = threading.Event()
+_SUPERVISOR_THREAD: threading.Thread | None = None
+
+_BUS_LEVEL_MODE = 3
+LEVEL_FLOOR_DB = -200.0
+
+_FIELD_READERS = {
+    "gain": lambda obj: obj.gain,
+    "mute": lambda obj: obj.mute,
+}
+
+# State mirror: only mutated while _VM_LOCK is held, read without it.
+_MIRROR_FIELDS: Dict[str, Dict[str, Any]] = {}
+_MIRROR_PARAMS: Dict[Tuple[str, bool], Any] = {}
+_MIRROR_SYNCED_AT: float | None = None
+# Allowlist the mirror's target set was built from; a reloaded allowlist forces a full refresh.
+_MIRROR_INDEX: allowlist.AllowlistIndex | None = None
+_MIRROR_STOP = threading.Event()
+_MIRROR_THREAD: threading.Thread | None = None
+
+# Write coalescing: pending writes keyed by target/field (or raw param), last value wins.
+_COALESCE_COND = threading.Condition()
+_PENDING_SETTINGS: Dict[str, Dict[str, Any]] = {}
+_PENDING_PARAMS: Dict[str, Any] = {}
+_COLLECTING_FLUSH = 1
+# flush_id -> futures of "applied" writers, settled from the flush thread on their own loop.
+_FLUSH_WAITERS: Dict[int, List[asyncio.Future]] = {}
+_FLUSH_STOP = threading.Event()
+_FLUSH_THREAD: threading.Thread | None = None
+
+
+class VoicemeeterUnavailableError(RuntimeError):
+    pass
+
 
 def _require_lib() -> None:
+    global voicemeeterlib, _IMPORT_ERROR, IMPORT_MS
+    if voicemeeterlib is None and _IMPORT_ERROR is None:
+        started = time.perf_counter()
+        try:
+            import voicemeeterlib as lib
+        except Exception as exc:  # pragma: no cover - import error path
+            _IMPORT_ERROR = exc
+            status.set_voicemeeter("unavailable", str(exc))
+        else:
+            voicemeeterlib = lib
+        IMPORT_MS = round((time.perf_counter() - started) * 1000.0, 1)
     if voicemeeterlib is None:
         raise RuntimeError(f"voicemeeter-api not available: {_IMPORT_ERROR}")
 
 
-def _get_vm():
+def _ensure_vm_locked():
     global _VM_CLIENT, _VM_LOGGED_IN
     _require_lib()
-    with _VM_LOCK:
-        if _VM_CLIENT is None:
-            _VM_CLIENT = voicemeeterlib.api(VOICEMEETER_KIND)
-        if not _VM_LOGGED_IN:
+    if _VM_CLIENT is None:
+        _VM_CLIENT = voicemeeterlib.api(VOICEMEETER_KIND)
+    if not _VM_LOGGED_IN:
+        with tracing.span("vm_login"):
             _VM_CLIENT.login()
-            _VM_LOGGED_IN = True
+        _VM_LOGGED_IN = True
+        status.set_voicemeeter("connected")
+        if metrics.VM_LOGINS.value():
+            metrics.VM_RECONNECTS.inc()
+        metrics.VM_LOGINS.inc()
+        metrics.VM_CALLS.inc("login")
     return _VM_CLIENT
 
 
+@contextmanager
+def _vm_locked() -> Iterator[None]:
+    requested = time.perf_counter()
+    with _VM_LOCK:
+        acquired = time.perf_counter()
+        metrics.VM_LOCK_WAIT.observe(acquired - requested)
+        tracing.record("vm_lock", acquired - requested)
+        try:
+            yield
+        finally:
+            metrics.VM_LOCK_HOLD.observe(time.perf_counter() - acquired)
+
+
+def _get_vm():
+    with _vm_locked():
+        return _ensure_vm_locked()
+
+
+def _check_breaker() -> None:
+    if _BREAKER_OPEN:
+        retry_in = max(0.0, _BREAKER_RETRY_AT - time.monotonic())
+        raise VoicemeeterUnavailableError(
+            f"Voicemeeter unavailable ({_BREAKER_ERROR}); next reconnect attempt in {retry_in:.1f}s"
+        )
+
+
+@contextmanager
+def _vm_session() -> Iterator[Any]:
+    _check_breaker()
+    with _vm_locked():
+        _check_breaker()
+        _require_lib()
+        try:
+            vm = _ensure_vm_locked()
+        except Exception as exc:
+            _open_breaker_locked(str(exc))
+            raise VoicemeeterUnavailableError(f"Voicemeeter unavailable ({exc})") from exc
+        # Everything a command does inside the session is Voicemeeter API work.
+        started = time.perf_counter()
+        try:
+            yield vm
+        except ValueError:
+            raise
+        except Exception:
+            # Possibly a dead session: have the supervisor probe it now.
+            _SUPERVISOR_WAKE.set()
+            raise
+        finally:
+            tracing.record("vm_dll", time.perf_counter() - started)
+
+
+def _drop_session_locked() -> None:
+    global _VM_CLIENT, _VM_LOGGED_IN
+    if _VM_CLIENT is not None and _VM_LOGGED_IN:
+        try:
+            _VM_CLIENT.logout()
+        except Exception:
+            pass
+    _VM_CLIENT = None
+    _VM_LOGGED_IN = False
+    _invalidate_mirror()
+
+
+def _open_breaker_locked(error: str) -> None:
+    global _BREAKER_OPEN, _BREAKER_ERROR, _BREAKER_RETRY_AT, _CONNECT_FAILURES, _CONN_CHANGED_AT
+    _CONNECT_FAILURES += 1
+    backoff = min(
+        VOICEMEETER_RECONNECT_BACKOFF_MAX_SECONDS,
+        VOICEMEETER_RECONNECT_BACKOFF_MIN_SECONDS * 2 ** (_CONNECT_FAILURES - 1),
+    )
+    _BREAKER_RETRY_AT = time.monotonic() + backoff
+    _BREAKER_ERROR = error
+    _drop_session_locked()
+    if not _BREAKER_OPEN:
+        _BREAKER_OPEN = True
+        _CONN_CHANGED_AT = time.time()
+        logging.getLogger("agent").warning(
+            "vm_breaker_open",
+            extra={"extra": {"event": "vm_breaker_open", "error": error, "retry_in_s": backoff}},
+        )
+    status.set_voicemeeter("error", error)
+
+
+def _close_breaker_locked() -> None:
+    global _BREAKER_OPEN, _BREAKER_ERROR, _CONNECT_FAILURES, _CONN_CHANGED_AT
+    if _BREAKER_OPEN:
+        logging.getLogger("agent").info(
+            "vm_breaker_closed",
+            extra={
+                "extra": {
+                    "event": "vm_breaker_closed",
+                    "attempts": _CONNECT_FAILURES,
+                    "down_s": round(time.time() - _CONN_CHANGED_AT, 3),
+                }
+            },
+        )
+        _BREAKER_OPEN = False
+        _CONN_CHANGED_AT = time.time()
+    _BREAKER_ERROR = None
+    _CONNECT_FAILURES = 0
+
+
+def _supervise_once() -> None:
+    if not _VM_LOCK.acquire(timeout=VOICEMEETER_SUPERVISOR_LOCK_TIMEOUT_SECONDS):
+        # Someone is mid-call, so the session is in use; check again next round.
+        return
+    try:
+        try:
+            vm = _ensure_vm_locked()
+            metrics.VM_CALLS.inc("probe")
+            vm.version
+        except Exception as exc:
+            _open_breaker_locked(str(exc))
+            return
+        _close_breaker_locked()
+        status.set_voicemeeter("connected")
+    finally:
+        _VM_LOCK.release()
+
+
+def _supervise() -> None:
+    logger = logging.getLogger("agent")
+    while not _SUPERVISOR_STOP.is_set():
+        if _BREAKER_OPEN:
+            _SUPERVISOR_STOP.wait(max(0.0, _BREAKER_RETRY_AT - time.monotonic()))
+        else:
+            _SUPERVISOR_WAKE.wait(VOICEMEETER_SUPERVISOR_INTERVAL_SECONDS)
+        _SUPERVISOR_WAKE.clear()
+        if _SUPERVISOR_STOP.is_set():
+            return
+        try:
+            _supervise_once()
+        except Exception as exc:
+            logger.error(
+                "vm_supervisor_error",
+                extra={"extra": {"event": "vm_supervisor_error", "error": str(exc)}},
+            )
+
+
+def start_supervisor() -> None:
+    global _SUPERVISOR_THREAD
+    if _IMPORT_ERROR is not None:
+        return
+    if _SUPERVISOR_THREAD is not None and _SUPERVISOR_THREAD.is_alive():
+        return
+    _SUPERVISOR_STOP.clear()
+    _SUPERVISOR_THREAD = threading.Thread(target=_supervise, name="vm-supervisor", daemon=True)
+    _SUPERVISOR_THREAD.start()
+
+
+def stop_supervisor() -> None:
+    global _SUPERVISOR_THREAD
+    _SUPERVISOR_STOP.set()
+    _SUPERVISOR_WAKE.set()
+    if _SUPERVISOR_THREAD is not None:
+        _SUPERVISOR_THREAD.join(timeout=2.0)
+        _SUPERVISOR_THREAD = None
+
+
+def connection_state() -> Dict[str, Any]:
+    if _BREAKER_OPEN:
+        state = "unavailable"
+    else:
+        state = "connected" if _VM_LOGGED_IN else "disconnected"
+    return {
+        "state": state,
+        "breaker": "open" if _BREAKER_OPEN else "closed",
+        "failures": _CONNECT_FAILURES,
+        "last_error": _BREAKER_ERROR,
+        "retry_in_s": round(max(0.0, _BREAKER_RETRY_AT - time.monotonic()), 3) if _BREAKER_OPEN else None,
+        "changed_at": _CONN_CHANGED_AT,
+        "supervised": _SUPERVISOR_THREAD is not None and _SUPERVISOR_THREAD.is_alive(),
+    }
+
+
+def warm_up() -> None:
+    global LOGIN_MS
+    started = time.perf_counter()
+    with _vm_session():
+        pass
+    LOGIN_MS = round((time.perf_counter() - started) * 1000.0, 1)
+
+
+def is_warm() -> bool:
+    return _VM_LOGGED_IN
+
+
 def shutdown_vm() -> None:
     global _VM_CLIENT, _VM_LOGGED_IN
+    stop_supervisor()
+    stop_mirror()
+    stop_coalescer()
     if _VM_CLIENT is None:
         return
-    with _VM_LOCK:
+    with _vm_locked():
         if _VM_CLIENT is not None and _VM_LOGGED_IN:
+            metrics.VM_CALLS.inc("logout")
             try:
                 _VM_CLIENT.logout()
             finally:
                 _VM_LOGGED_IN = False
+                _invalidate_mirror()
+                status.set_voicemeeter("disconnected")
 
 
-def _matches_any(value: str, patterns: Iterable[str]) -> bool:
-    return any(re.fullmatch(pattern, value) for pattern in patterns)
+def _mirror_targets(index: allowlist.AllowlistIndex) -> List[str]:
+    strips = [f"strip-{idx}" for idx in sorted(index.strips)]
+    buses = [f"bus-{idx}" for idx in sorted(index.buses)]
+    return strips + buses
 
 
-def _parse_strip_bus(target: str) -> Tuple[str, int] | None:
-    strip_match = re.fullmatch(r"strip-(\d+)", target)
-    if strip_match:
-        return "strip", int(strip_match.group(1))
-    bus_match = re.fullmatch(r"bus-(\d+)", target)
-    if bus_match:
-        return "bus", int(bus_match.group(1))
-    return None
+def _invalidate_mirror() -> None:
+    global _MIRROR_SYNCED_AT
+    _MIRROR_SYNCED_AT = None
 
 
-def _validate_target(target: str) -> None:
-    if not _matches_any(target, VOICEMEETER_ALLOWED_TARGET_PATTERNS):
-        raise ValueError(f"Target not allowed: {target}")
-    parsed = _parse_strip_bus(target)
-    if not parsed:
+def _refresh_mirror_locked(vm) -> None:
+    global _MIRROR_FIELDS, _MIRROR_PARAMS, _MIRROR_SYNCED_AT, _MIRROR_INDEX
+    index = allowlist.INDEX
+    fields: Dict[str, Dict[str, Any]] = {}
+    for target in _mirror_targets(index):
+        obj = _target_object(vm, target)
+        fields[target] = {name: reader(obj) for name, reader in _FIELD_READERS.items()}
+    params = {key: vm.get(key[0], is_string=key[1]) for key in _MIRROR_PARAMS}
+    metrics.VM_CALLS.inc("read", amount=len(fields) * len(_FIELD_READERS))
+    if params:
+        metrics.VM_CALLS.inc("get", amount=len(params))
+    _MIRROR_FIELDS = fields
+    _MIRROR_PARAMS = params
+    _MIRROR_SYNCED_AT = time.monotonic()
+    _MIRROR_INDEX = index
+
+
+def _sync_mirror_locked(vm) -> None:
+    global _MIRROR_SYNCED_AT
+    metrics.VM_CALLS.inc("pdirty")
+    if vm.pdirty or _MIRROR_SYNCED_AT is None or _MIRROR_INDEX is not allowlist.INDEX:
+        _refresh_mirror_locked(vm)
+    else:
+        _MIRROR_SYNCED_AT = time.monotonic()
+
+
+def _poll_mirror_once() -> None:
+    if not _VM_LOGGED_IN:
         return
-    kind, idx = parsed
-    if kind == "strip" and idx not in VOICEMEETER_ALLOWED_STRIPS:
-        raise ValueError(f"Strip not allowed: {target}")
-    if kind == "bus" and idx not in VOICEMEETER_ALLOWED_BUSES:
-        raise ValueError(f"Bus not allowed: {target}")
+    with _vm_locked():
+        if not _VM_LOGGED_IN or _VM_CLIENT is None:
+            return
+        _sync_mirror_locked(_VM_CLIENT)
+    status.set_voicemeeter("connected")
+
+
+def _mirror_loop() -> None:
+    logger = logging.getLogger("agent")
+    while not _MIRROR_STOP.wait(VOICEMEETER_MIRROR_POLL_SECONDS):
+        try:
+            _poll_mirror_once()
+        except Exception as exc:
+            _invalidate_mirror()
+            _SUPERVISOR_WAKE.set()
+            logger.warning(
+                "vm_mirror_error",
+                extra={"extra": {"event": "vm_mirror_error", "error": str(exc)}},
+            )
+            _MIRROR_STOP.wait(1.0)
+
+
+def start_mirror() -> None:
+    global _MIRROR_THREAD
+    if not VOICEMEETER_MIRROR_ENABLED or _IMPORT_ERROR is not None:
+        return
+    if _MIRROR_THREAD is not None and _MIRROR_THREAD.is_alive():
+        return
+    _MIRROR_STOP.clear()
+    _MIRROR_THREAD = threading.Thread(target=_mirror_loop, name="vm-mirror", daemon=True)
+    _MIRROR_THREAD.start()
+
+
+def stop_mirror() -> None:
+    global _MIRROR_THREAD
+    _MIRROR_STOP.set()
+    if _MIRROR_THREAD is not None:
+        _MIRROR_THREAD.join(timeout=2.0)
+        _MIRROR_THREAD = None
+
+
+def _mirror_age_ms() -> float | None:
+    synced_at = _MIRROR_SYNCED_AT
+    if synced_at is None:
+        return None
+    return round((time.monotonic() - synced_at) * 1000.0, 3)
+
+
+def _mirror_write_through(settings: Dict[str, Dict[str, Any]]) -> None:
+    if _MIRROR_SYNCED_AT is None:
+        return
+    for target, fields in settings.items():
+        cached = _MIRROR_FIELDS.get(target)
+        if cached is None:
+            continue
+        if "gain" in fields:
+            cached["gain"] = round(float(fields["gain"]), 1)
+        if "mute" in fields:
+            cached["mute"] = bool(fields["mute"])
 
 
 def _flatten_fields(value: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
@@ -98,10 +431,11 @@ def _flatten_fields(value: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
     return flat
 
 
-def _validate_field_paths(paths: Iterable[str]) -> None:
+def _validate_field_paths(paths: Iterable[str], index: allowlist.AllowlistIndex) -> None:
     for path in paths:
-        if not _matches_any(path, VOICEMEETER_ALLOWED_FIELD_PATTERNS):
-            raise ValueError(f"Field not allowed: {path}")
+        error = index.field_error(path)
+        if error:
+            raise ValueError(error)
 
 
 def _validate_gain_value(value: Any) -> None:
@@ -117,51 +451,103 @@ def _validate_mute_value(value: Any) -> None:
 
 
 def _validate_settings(settings: Dict[str, Dict[str, Any]]) -> None:
+    index = allowlist.INDEX
     for target, fields in settings.items():
-        _validate_target(target)
+        error = index.target_error(target)
+        if error:
+            raise ValueError(error)
         flat_fields = _flatten_fields(fields)
-        _validate_field_paths(flat_fields.keys())
         for path, value in flat_fields.items():
+            error = index.field_error(path)
+            if error:
+                raise ValueError(error)
             if path == "gain":
                 _validate_gain_value(value)
             elif path == "mute":
                 _validate_mute_value(value)
 
 
-def apply_settings(settings: Dict[str, Dict[str, Any]]) -> int:
+def prepare_settings(settings: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
     if not settings:
         raise ValueError("Settings must not be empty")
     _validate_settings(settings)
-    vm = _get_vm()
-    vm.apply(settings)
-    return len(settings)
+    return settings
 
 
-def apply_group_bus_gain(gain: float) -> Dict[str, Any]:
+def prepare_group_bus_gain(gain: float) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
     _validate_gain_value(gain)
+    allowed_buses = allowlist.INDEX.buses
     for bus_id in VOICEMEETER_GROUP_BUS_IDS:
-        if bus_id not in VOICEMEETER_ALLOWED_BUSES:
+        if bus_id not in allowed_buses:
             raise ValueError(f"Bus not allowed: bus-{bus_id}")
     settings = {f"bus-{bus_id}": {"gain": gain} for bus_id in VOICEMEETER_GROUP_BUS_IDS}
-    vm = _get_vm()
-    vm.apply(settings)
-    return {"bus_group": list(VOICEMEETER_GROUP_BUS_IDS), "gain": gain}
+    return settings, {"bus_group": list(VOICEMEETER_GROUP_BUS_IDS), "gain": gain}
+
+
+def _merge_settings(settings_list: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    merged: Dict[str, Dict[str, Any]] = {}
+    for settings in settings_list:
+        for target, fields in settings.items():
+            merged.setdefault(target, {}).update(fields)
+    return merged
+
+
+def apply_prepared_settings(settings_list: List[Dict[str, Dict[str, Any]]]) -> int:
+    merged = _merge_settings(settings_list)
+    with _vm_session() as vm:
+        metrics.VM_CALLS.inc("apply")
+        vm.apply(merged)
+        _mirror_write_through(merged)
+    return len(merged)
+
+
+def capture_fields() -> Dict[str, Dict[str, Any]]:
+    with _vm_session() as vm:
+        _sync_mirror_locked(vm)
+        return {target: dict(fields) for target, fields in _MIRROR_FIELDS.items()}
+
+
+def apply_diff(settings: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    # Compares against the mirror (re-read only if Voicemeeter reports dirty
+    # params) so a scene switch costs one apply of just the changed fields.
+    _validate_settings(settings)
+    changes: Dict[str, Dict[str, Any]] = {}
+    with _vm_session() as vm:
+        _sync_mirror_locked(vm)
+        for target, fields in settings.items():
+            current = _MIRROR_FIELDS.get(target, {})
+            diff = {name: value for name, value in fields.items() if current.get(name) != value}
+            if diff:
+                changes[target] = diff
+        if changes:
+            metrics.VM_CALLS.inc("apply")
+            vm.apply(changes)
+            _mirror_write_through(changes)
+    return changes
+
+
+def apply_group_bus_gain(gain: float) -> Dict[str, Any]:
+    settings, result = prepare_group_bus_gain(gain)
+    apply_prepared_settings([settings])
+    return result
 
 
 def run_command(command: str) -> None:
-    if command not in VOICEMEETER_ALLOWED_COMMANDS:
+    if command not in allowlist.INDEX.commands:
         raise ValueError(f"Command not allowed: {command}")
-    vm = _get_vm()
-    if command == "reset":
-        vm.command.reset()
-    elif command == "restart":
-        vm.command.restart()
-    else:
-        raise ValueError(f"Unknown command: {command}")
+    with _vm_session() as vm:
+        metrics.VM_CALLS.inc("command")
+        if command == "reset":
+            vm.command.reset()
+        elif command == "restart":
+            vm.command.restart()
+        else:
+            raise ValueError(f"Unknown command: {command}")
+        _invalidate_mirror()
 
 
 def _target_object(vm, target: str):
-    parsed = _parse_strip_bus(target)
+    parsed = allowlist.INDEX.parse_target(target)
     if not parsed:
         raise ValueError(f"Unsupported target for read: {target}")
     kind, idx = parsed
@@ -172,64 +558,241 @@ def _target_object(vm, target: str):
     raise ValueError(f"Unsupported target: {target}")
 
 
-def get_targets_fields(targets: List[str], fields: List[str]) -> Dict[str, Dict[str, Any]]:
+def validate_targets_fields(targets: List[str], fields: List[str]) -> None:
     if not targets:
         raise ValueError("Targets must not be empty")
     if not fields:
         raise ValueError("Fields must not be empty")
+    index = allowlist.INDEX
     for target in targets:
-        _validate_target(target)
-    _validate_field_paths(fields)
+        error = index.target_error(target)
+        if error:
+            raise ValueError(error)
+    _validate_field_paths(fields, index)
 
-    field_readers = {
-        "gain": lambda obj: obj.gain,
-        "mute": lambda obj: obj.mute,
-    }
     for field in fields:
-        if field not in field_readers:
+        if field not in _FIELD_READERS:
             raise ValueError(f"Field not supported for read: {field}")
 
-    vm = _get_vm()
+
+def get_targets_fields(
+    targets: List[str], fields: List[str], live: bool = False
+) -> Tuple[Dict[str, Dict[str, Any]], float | None]:
+    validate_targets_fields(targets, fields)
+    if not live:
+        age_ms = _mirror_age_ms()
+        mirror = _MIRROR_FIELDS
+        if age_ms is not None and all(target in mirror for target in targets):
+            return {target: {field: mirror[target][field] for field in fields} for target in targets}, age_ms
+
     result: Dict[str, Dict[str, Any]] = {}
-    for target in targets:
-        obj = _target_object(vm, target)
-        result[target] = {field: field_readers[field](obj) for field in fields}
-    return result
+    with _vm_session() as vm:
+        metrics.VM_CALLS.inc("read", amount=len(targets) * len(fields))
+        for target in targets:
+            obj = _target_object(vm, target)
+            result[target] = {field: _FIELD_READERS[field](obj) for field in fields}
+    return result, None
 
 
 def _validate_param_allowed(param: str) -> None:
-    if not VOICEMEETER_ALLOWED_PARAM_PATTERNS:
-        raise ValueError("Raw parameter access is disabled")
-    if not _matches_any(param, VOICEMEETER_ALLOWED_PARAM_PATTERNS):
-        raise ValueError(f"Param not allowed: {param}")
+    error = allowlist.INDEX.param_error(param)
+    if error:
+        raise ValueError(error)
+
+
+def _parse_param_entry(entry: Dict[str, Any]) -> Tuple[str, bool]:
+    param = entry.get("param")
+    is_string = bool(entry.get("is_string", False))
+    if not param or not isinstance(param, str):
+        raise ValueError("Param must be a string")
+    _validate_param_allowed(param)
+    return param, is_string
 
 
-def get_params(params: List[Dict[str, Any]]) -> Dict[str, Any]:
+def validate_params(params: List[Dict[str, Any]]) -> List[Tuple[str, bool]]:
     if not params:
         raise ValueError("Params must not be empty")
-    vm = _get_vm()
+    return [_parse_param_entry(entry) for entry in params]
+
+
+def get_params(params: List[Dict[str, Any]], live: bool = False) -> Tuple[Dict[str, Any], float | None]:
+    keys = validate_params(params)
+
+    if not live:
+        age_ms = _mirror_age_ms()
+        mirror = _MIRROR_PARAMS
+        if age_ms is not None and all(key in mirror for key in keys):
+            return {key[0]: mirror[key] for key in keys}, age_ms
+
     values: Dict[str, Any] = {}
-    for entry in params:
-        param = entry.get("param")
-        is_string = bool(entry.get("is_string", False))
-        if not param or not isinstance(param, str):
-            raise ValueError("Param must be a string")
-        _validate_param_allowed(param)
-        values[param] = vm.get(param, is_string=is_string)
-    return values
+    with _vm_session() as vm:
+        metrics.VM_CALLS.inc("get", amount=len(keys))
+        for key in keys:
+            value = vm.get(key[0], is_string=key[1])
+            values[key[0]] = value
+            if _MIRROR_SYNCED_AT is not None and len(_MIRROR_PARAMS) < VOICEMEETER_MIRROR_MAX_PARAMS:
+                _MIRROR_PARAMS[key] = value
+    return values, None
 
 
 def set_params(params: List[Dict[str, Any]]) -> int:
-    if not params:
-        raise ValueError("Params must not be empty")
-    vm = _get_vm()
-    for entry in params:
-        param = entry.get("param")
-        value = entry.get("value")
-        if not param or not isinstance(param, str):
-            raise ValueError("Param must be a string")
-        _validate_param_allowed(param)
-        vm.set(param, value)
+    keys = validate_params(params)
+    with _vm_session() as vm:
+        for (param, _), entry in zip(keys, params):
+            metrics.VM_CALLS.inc("set")
+            vm.set(param, entry.get("value"))
+            _MIRROR_PARAMS.pop((param, False), None)
+            _MIRROR_PARAMS.pop((param, True), None)
     return len(params)
 
 
+def _level_db(value: float) -> float:
+    return 20.0 * math.log10(value) if value > 0 else LEVEL_FLOOR_DB
+
+
+def level_channels() -> Dict[str, Tuple[int, int]]:
+    index = allowlist.INDEX
+    with _vm_session() as vm:
+        strip_count = vm.kind.num_strip_levels
+        channels: Dict[str, Tuple[int, int]] = {}
+        for idx in sorted(index.strips):
+            start, end = vm.strip[idx].levels.range
+            channels[f"strip-{idx}"] = (start, end)
+        for idx in sorted(index.buses):
+            start, end = vm.bus[idx].levels.range
+            channels[f"bus-{idx}"] = (strip_count + start, strip_count + end)
+    return channels
+
+
+def read_levels(indices: List[int]) -> Dict[int, float]:
+    # Indices follow level_channels(): strip channels first, then bus channels.
+    with _vm_session() as vm:
+        strip_count = vm.kind.num_strip_levels
+        raw = {
+            idx: vm.get_level(VOICEMEETER_METER_STRIP_MODE, idx)
+            if idx < strip_count
+            else vm.get_level(_BUS_LEVEL_MODE, idx - strip_count)
+            for idx in indices
+        }
+    metrics.VM_CALLS.inc("get_level", amount=len(raw))
+    return {idx: _level_db(value) for idx, value in raw.items()}
+
+
+def _ensure_flusher_locked() -> None:
+    global _FLUSH_THREAD
+    if _FLUSH_THREAD is not None and _FLUSH_THREAD.is_alive():
+        return
+    _FLUSH_STOP.clear()
+    _FLUSH_THREAD = threading.Thread(target=_flush_loop, name="vm-coalesce", daemon=True)
+    _FLUSH_THREAD.start()
+
+
+def _flush_loop() -> None:
+    global _PENDING_SETTINGS, _PENDING_PARAMS, _COLLECTING_FLUSH
+    window = VOICEMEETER_COALESCE_WINDOW_MS / 1000.0
+    while True:
+        with _COALESCE_COND:
+            while not (_PENDING_SETTINGS or _PENDING_PARAMS) and not _FLUSH_STOP.is_set():
+                _COALESCE_COND.wait()
+            if not (_PENDING_SETTINGS or _PENDING_PARAMS):
+                return
+        _FLUSH_STOP.wait(window)
+        with _COALESCE_COND:
+            settings, params = _PENDING_SETTINGS, _PENDING_PARAMS
+            _PENDING_SETTINGS, _PENDING_PARAMS = {}, {}
+            flush_id = _COLLECTING_FLUSH
+            _COLLECTING_FLUSH += 1
+            waiters = _FLUSH_WAITERS.pop(flush_id, [])
+        error = None
+        try:
+            with _vm_session() as vm:
+                if settings:
+                    metrics.VM_CALLS.inc("apply")
+                    vm.apply(settings)
+                    _mirror_write_through(settings)
+                for param, value in params.items():
+                    vm.set(param, value)
+                    metrics.VM_CALLS.inc("set")
+                    _MIRROR_PARAMS.pop((param, False), None)
+                    _MIRROR_PARAMS.pop((param, True), None)
+        except Exception as exc:
+            # "queued" writers were already answered, so this line and the counter are all they get.
+            error = str(exc)
+            metrics.VM_COALESCE_FAILURES.inc()
+            logging.getLogger("agent").warning(
+                "vm_coalesce_error",
+                extra={
+                    "extra": {
+                        "event": "vm_coalesce_error",
+                        "flush_id": flush_id,
+                        "targets": len(settings),
+                        "params": len(params),
+                        "waiters": len(waiters),
+                        "error": error,
+                    }
+                },
+            )
+        for waiter in waiters:
+            try:
+                waiter.get_loop().call_soon_threadsafe(_settle_waiter, waiter, error)
+            except RuntimeError:
+                pass
+
+
+def _settle_waiter(waiter: asyncio.Future, error: str | None) -> None:
+    if waiter.done():
+        return
+    if error is None:
+        waiter.set_result(None)
+    else:
+        waiter.set_exception(RuntimeError(error))
+
+
+async def _enqueue(settings: Dict[str, Dict[str, Any]], params: Dict[str, Any], ack: str) -> Dict[str, Any]:
+    # Runs on the event loop: it only touches the pending maps, and "applied" writers await
+    # their flush without holding a lane worker, so concurrent writes can join the same flush.
+    if ack not in ("queued", "applied"):
+        raise ValueError(f"Unknown coalesce mode: {ack}")
+    waiter = None
+    with _COALESCE_COND:
+        for target, fields in settings.items():
+            _PENDING_SETTINGS.setdefault(target, {}).update(fields)
+        _PENDING_PARAMS.update(params)
+        flush_id = _COLLECTING_FLUSH
+        if ack == "applied":
+            waiter = asyncio.get_running_loop().create_future()
+            _FLUSH_WAITERS.setdefault(flush_id, []).append(waiter)
+        _ensure_flusher_locked()
+        _COALESCE_COND.notify_all()
+    if waiter is None:
+        return {"status": "queued", "flush_id": flush_id, "window_ms": VOICEMEETER_COALESCE_WINDOW_MS}
+    try:
+        await asyncio.wait_for(waiter, VOICEMEETER_COALESCE_WAIT_SECONDS)
+    except asyncio.TimeoutError:
+        raise RuntimeError("Timed out waiting for coalesced write to apply") from None
+    return {"status": "applied", "flush_id": flush_id}
+
+
+async def queue_settings(settings: Dict[str, Dict[str, Any]], ack: str) -> Dict[str, Any]:
+    prepared = prepare_settings(settings)
+    result = await _enqueue(prepared, {}, ack)
+    result["targets"] = len(prepared)
+    return result
+
+
+async def queue_params(params: List[Dict[str, Any]], ack: str) -> Dict[str, Any]:
+    keys = validate_params(params)
+    pending = {param: entry.get("value") for (param, _), entry in zip(keys, params)}
+    result = await _enqueue({}, pending, ack)
+    result["params"] = len(pending)
+    return result
+
+
+def stop_coalescer() -> None:
+    global _FLUSH_THREAD
+    _FLUSH_STOP.set()
+    with _COALESCE_COND:
+        _COALESCE_COND.notify_all()
+    if _FLUSH_THREAD is not None:
+        _FLUSH_THREAD.join(timeout=2.0)
+        _FLUSH_THREAD = None
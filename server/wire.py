@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict, List, Tuple
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+JSON = "json"
+
+# Request Content-Type / Accept media type -> codec. Binary codecs are optional
+# dependencies (pip install .[binary]) imported on first use.
+_MEDIA_TYPES: Dict[str, str] = {
+    "application/json": JSON,
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.msgpack": "msgpack",
+    "application/cbor": "cbor",
+}
+_RESPONSE_MEDIA_TYPES: Dict[str, str] = {
+    JSON: "application/json",
+    "msgpack": "application/msgpack",
+    "cbor": "application/cbor",
+}
+_CODEC_MODULES: Dict[str, str] = {"msgpack": "msgpack", "cbor": "cbor2"}
+_LOADED: Dict[str, Any] = {}
+_IMPORT_ERRORS: Dict[str, Exception] = {}
+
+
+def _module(codec: str) -> Any | None:
+    module = _LOADED.get(codec)
+    if module is None and codec not in _IMPORT_ERRORS:
+        try:
+            module = importlib.import_module(_CODEC_MODULES[codec])
+        except ImportError as exc:
+            _IMPORT_ERRORS[codec] = exc
+        else:
+            _LOADED[codec] = module
+    return module
+
+
+def available() -> List[str]:
+    return [JSON] + [codec for codec in _CODEC_MODULES if _module(codec) is not None]
+
+
+def _media_type(header: str) -> str:
+    return header.split(";", 1)[0].strip().lower()
+
+
+def request_codec(content_type: str | None) -> str:
+    codec = _MEDIA_TYPES.get(_media_type(content_type or ""), JSON)
+    if codec != JSON and _module(codec) is None:
+        raise HTTPException(status_code=415, detail=f"{codec} support is not installed")
+    return codec
+
+
+def response_codec(accept: str | None, default: str = JSON) -> str:
+    # Highest q first; */* (or no Accept header) answers in the request's encoding.
+    if not accept:
+        return default
+    ranked: List[Tuple[float, int, str]] = []
+    for pos, part in enumerate(accept.split(",")):
+        media, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            ranked.append((-quality, pos, media.lower()))
+    for _, _, media in sorted(ranked):
+        if media in ("*/*", "application/*"):
+            return default
+        codec = _MEDIA_TYPES.get(media)
+        if codec is not None and (codec == JSON or _module(codec) is not None):
+            return codec
+    return JSON
+
+
+def decode(codec: str, raw: bytes) -> Any:
+    # JSON stays as bytes so pydantic can validate it without an intermediate dict.
+    if codec == JSON:
+        return raw
+    try:
+        if codec == "msgpack":
+            return _LOADED[codec].unpackb(raw, raw=False)
+        return _LOADED[codec].loads(raw)
+    except Exception as exc:
+        message = f"Invalid {codec} body: {str(exc) or type(exc).__name__}"
+        raise RequestValidationError(
+            [{"type": f"{codec}_invalid", "loc": ("body",), "msg": message, "input": None}]
+        ) from None
+
+
+def _plain(value: Any) -> Any:
+    # Shallow field walk: handler results are already plain data, so only the
+    # response models themselves need unwrapping.
+    if isinstance(value, BaseModel):
+        return {name: _plain(item) for name, item in value}
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    return value
+
+
+def encode(codec: str, model: BaseModel, status_code: int = 200) -> Response:
+    media_type = _RESPONSE_MEDIA_TYPES[codec]
+    if codec == JSON:
+        body = model.model_dump_json()
+    elif codec == "msgpack":
+        body = _LOADED[codec].packb(_plain(model), use_bin_type=True)
+    else:
+        body = _LOADED[codec].dumps(_plain(model))
+    return Response(content=body, status_code=status_code, media_type=media_type)
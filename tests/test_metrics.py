@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from server.metrics import Counter, Gauge, Histogram
+
+
+def test_counter_renders_large_values_exactly() -> None:
+    counter = Counter("agent_test_total", "Test counter.", ("op",))
+    counter.inc("get_level", amount=383616123)
+    counter.inc("get_level")
+    assert counter.render()[-1] == 'agent_test_total{op="get_level"} 383616124'
+
+
+def test_histogram_renders_counts_and_sum_exactly() -> None:
+    histogram = Histogram("agent_test_seconds", "Test histogram.", buckets=(0.0001, 0.5))
+    histogram.observe(0.00005)
+    histogram.observe(0.25)
+    histogram.observe(3.0)
+    lines = histogram.render()
+    assert 'agent_test_seconds_bucket{le="0.0001"} 1' in lines
+    assert 'agent_test_seconds_bucket{le="0.5"} 2' in lines
+    assert 'agent_test_seconds_bucket{le="+Inf"} 3' in lines
+    assert f"agent_test_seconds_sum {0.00005 + 0.25 + 3.0!r}" in lines
+    assert "agent_test_seconds_count 3" in lines
+
+
+def test_gauge_renders_fractions_with_full_precision() -> None:
+    gauge = Gauge("agent_test_gauge", "Test gauge.", lambda: [({"lane": "vm"}, 1234567.25)])
+    assert gauge.render()[-1] == 'agent_test_gauge{lane="vm"} 1234567.25'
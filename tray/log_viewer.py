@@ -1,7 +1,161 @@
 from __future__ import annotations
 
+import json
+import os
+import queue
+import threading
 import tkinter as tk
+from collections import deque
 from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+POLL_SECONDS = 0.25
+INITIAL_TAIL_BYTES = 256 * 1024
+MAX_LINES = 2000
+MAX_ROTATED_FILES = 5
+HEAD_BYTES = 64
+LEVELS = ("ALL", "INFO", "WARNING", "ERROR")
+_LEVEL_RANK = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+
+_Record = Tuple[str, Optional[dict]]
+
+
+class LogFilter:
+    def __init__(self, level: str = "ALL", action: str = "", request_id: str = "") -> None:
+        self.min_rank = _LEVEL_RANK.get(level, 0)
+        self.action = action.strip()
+        self.request_id = request_id.strip()
+        self.active = bool(self.min_rank or self.action or self.request_id)
+
+    def matches(self, record: _Record) -> bool:
+        if not self.active:
+            return True
+        data = record[1]
+        if data is None:
+            return False
+        if self.min_rank and _LEVEL_RANK.get(str(data.get("level")), 0) < self.min_rank:
+            return False
+        if self.action and self.action not in str(data.get("action") or data.get("event") or ""):
+            return False
+        if self.request_id and self.request_id not in str(data.get("request_id") or ""):
+            return False
+        return True
+
+
+class LogFollower:
+    # Opens the file only for the duration of each read so RotatingFileHandler can rename it on Windows.
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self.updates: queue.Queue[Tuple[str, List[str]]] = queue.Queue()
+        self._recent: Deque[_Record] = deque(maxlen=MAX_LINES * 4)
+        self._filter = LogFilter()
+        self._filter_changed = threading.Event()
+        self._stop = threading.Event()
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._head = b""
+        self._offset = 0
+        self._partial = b""
+        self._skip_partial_line = False
+        self._thread = threading.Thread(target=self._run, name="log-follower", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._filter_changed.set()
+
+    def set_filter(self, log_filter: LogFilter) -> None:
+        self._filter = log_filter
+        self._filter_changed.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._filter_changed.is_set():
+                self._filter_changed.clear()
+                log_filter = self._filter
+                self.updates.put(("reset", [line for line, data in self._recent if log_filter.matches((line, data))]))
+            try:
+                records = self._read_new()
+            except OSError:
+                records = []
+            if records:
+                self._recent.extend(records)
+                log_filter = self._filter
+                lines = [line for line, data in records if log_filter.matches((line, data))]
+                if lines:
+                    self.updates.put(("append", lines))
+            self._filter_changed.wait(POLL_SECONDS)
+
+    def _read_new(self) -> List[_Record]:
+        try:
+            handle = open(self.log_path, "rb")
+        except FileNotFoundError:
+            return []
+        records: List[_Record] = []
+        with handle:
+            stat = os.fstat(handle.fileno())
+            file_id = (stat.st_dev, stat.st_ino)
+            # The head bytes guard against a recycled inode after old backups are deleted.
+            head = handle.read(HEAD_BYTES)
+            if self._file_id is None:
+                self._offset = max(0, stat.st_size - INITIAL_TAIL_BYTES)
+                self._skip_partial_line = self._offset > 0
+            elif file_id != self._file_id or stat.st_size < self._offset or not head.startswith(self._head):
+                records.extend(self._drain_rotated())
+                self._offset = 0
+                self._partial = b""
+                self._skip_partial_line = False
+            self._file_id = file_id
+            self._head = head
+            if stat.st_size > self._offset:
+                handle.seek(self._offset)
+                chunk = handle.read(stat.st_size - self._offset)
+                self._offset += len(chunk)
+                records.extend(self._split(chunk))
+        return records
+
+    def _drain_rotated(self) -> List[_Record]:
+        # Lines written since our last read now live in the file we were following
+        # (renamed to agent.log.N) and in any newer backups created after it.
+        chunks: List[bytes] = []
+        for idx in range(1, MAX_ROTATED_FILES + 1):
+            rotated = self.log_path.with_name(f"{self.log_path.name}.{idx}")
+            try:
+                with open(rotated, "rb") as handle:
+                    stat = os.fstat(handle.fileno())
+                    if (stat.st_dev, stat.st_ino) == self._file_id and handle.read(len(self._head)) == self._head:
+                        handle.seek(self._offset)
+                        chunks.append(handle.read())
+                        break
+                    handle.seek(0)
+                    chunks.append(handle.read())
+            except OSError:
+                return []
+        else:
+            return []
+        records = self._split(chunks[-1] + b"\n")
+        for chunk in reversed(chunks[:-1]):
+            records.extend(self._split(chunk))
+        return records
+
+    def _split(self, chunk: bytes) -> List[_Record]:
+        data = self._partial + chunk
+        *lines, self._partial = data.split(b"\n")
+        if self._skip_partial_line and lines:
+            lines = lines[1:]
+            self._skip_partial_line = False
+        records: List[_Record] = []
+        for raw in lines:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            if not line:
+                continue
+            try:
+                parsed = json.loads(line)
+            except ValueError:
+                parsed = None
+            records.append((line, parsed if isinstance(parsed, dict) else None))
+        return records
 
 
 class LogViewer:
@@ -11,24 +165,60 @@ class LogViewer:
         self.root.title("IntegrateAgent Logs")
         self.root.geometry("800x500")
 
+        controls = tk.Frame(self.root)
+        controls.pack(fill="x")
+        self.level_var = tk.StringVar(value="ALL")
+        self.action_var = tk.StringVar()
+        self.request_id_var = tk.StringVar()
+        tk.Label(controls, text="Level").pack(side="left")
+        tk.OptionMenu(controls, self.level_var, *LEVELS).pack(side="left")
+        tk.Label(controls, text="Action").pack(side="left")
+        tk.Entry(controls, textvariable=self.action_var, width=20).pack(side="left")
+        tk.Label(controls, text="Request ID").pack(side="left")
+        tk.Entry(controls, textvariable=self.request_id_var, width=20).pack(side="left")
+        for var in (self.level_var, self.action_var, self.request_id_var):
+            var.trace_add("write", self._on_filter_change)
+
         self.text = tk.Text(self.root, wrap="none")
         self.text.pack(fill="both", expand=True)
+        self.text.insert("end", "<waiting for log file>\n" if not log_path.exists() else "")
+        self._placeholder = not log_path.exists()
+
+        self.follower = LogFollower(log_path)
+        self.follower.start()
+        self.root.protocol("WM_DELETE_WINDOW", self._close)
+        self._drain()
+
+    def _on_filter_change(self, *_args) -> None:
+        self.follower.set_filter(
+            LogFilter(self.level_var.get(), self.action_var.get(), self.request_id_var.get())
+        )
+
+    def _drain(self) -> None:
+        updates = []
+        try:
+            while True:
+                updates.append(self.follower.updates.get_nowait())
+        except queue.Empty:
+            pass
+        if updates:
+            at_bottom = self.text.yview()[1] >= 0.999
+            for kind, lines in updates:
+                if kind == "reset" or self._placeholder:
+                    self.text.delete("1.0", "end")
+                    self._placeholder = False
+                if lines:
+                    self.text.insert("end", "\n".join(lines) + "\n")
+            excess = int(self.text.index("end-1c").split(".")[0]) - 1 - MAX_LINES
+            if excess > 0:
+                self.text.delete("1.0", f"{excess + 1}.0")
+            if at_bottom:
+                self.text.see("end")
+        self.root.after(200, self._drain)
 
-        self._poll()
-
-    def _read_tail(self, n: int = 300) -> str:
-        if not self.log_path.exists():
-            return "<log file does not exist yet>"
-        with self.log_path.open("r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()[-n:]
-        return "".join(lines)
-
-    def _poll(self) -> None:
-        content = self._read_tail()
-        self.text.delete("1.0", "end")
-        self.text.insert("end", content)
-        self.text.see("end")
-        self.root.after(1000, self._poll)
+    def _close(self) -> None:
+        self.follower.stop()
+        self.root.destroy()
 
     def run(self) -> None:
         self.root.mainloop()
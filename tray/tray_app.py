@@ -1,11 +1,11 @@
 from __future__ import annotations
 
 import datetime as dt
+import json
 import os
 import subprocess
 import sys
 import threading
-import time
 from pathlib import Path
 from typing import Optional
 
@@ -26,13 +26,19 @@ ENV_FILE = BASE_DIR / ".env"
 ENV_SERVER_OUTPUT_LOG_ENABLED = "TRAY_SERVER_OUTPUT_LOG_ENABLED"
 ENV_SERVER_OUTPUT_LOG_DAILY_CLEAR = "TRAY_SERVER_OUTPUT_LOG_DAILY_CLEAR"
 
-SERVER_URL = "http://127.0.0.1:8765/health"
+STATUS_EVENTS_URL = "http://127.0.0.1:8765/health/events"
+# Server keepalives arrive every 15 s; treat a longer silence as a dead connection.
+STATUS_READ_TIMEOUT = 30
+STATUS_RETRY_MIN = 0.25
+STATUS_RETRY_MAX = 2.0
 
 
 class TrayApp:
     def __init__(self) -> None:
         self.icon = pystray.Icon("IntegrateAgent")
-        self.icon.icon = Image.open(ICON_BAD)
+        self._icons = {True: self._load_icon(ICON_OK), False: self._load_icon(ICON_BAD)}
+        self._shown: Optional[tuple] = None
+        self._show_status(False, "IntegrateAgent: server not reachable")
         self.server_proc: Optional[subprocess.Popen] = None
         self.server_log_handle = None
         self._stop_event = threading.Event()
@@ -70,6 +76,8 @@ class TrayApp:
             "0.0.0.0",
             "--port",
             "8765",
+            "--timeout-graceful-shutdown",
+            "2",
         ]
         self.server_proc = subprocess.Popen(
             cmd,
@@ -140,22 +148,53 @@ class TrayApp:
         self.stop_server()
         self.icon.stop()
 
-    def _poll_health(self) -> None:
-        while not self._stop_event.is_set():
-            ok = False
-            try:
-                resp = requests.get(SERVER_URL, timeout=1)
-                ok = resp.status_code == 200
-            except Exception:
-                ok = False
-            self.icon.icon = Image.open(ICON_OK if ok else ICON_BAD)
-            time.sleep(2)
+    def _load_icon(self, path: Path) -> Image.Image:
+        image = Image.open(path)
+        image.load()
+        return image
+
+    def _show_status(self, ok: bool, title: str) -> None:
+        if self._shown == (ok, title):
+            return
+        self._shown = (ok, title)
+        self.icon.icon = self._icons[ok]
+        self.icon.title = title
+
+    def _status_title(self, state: dict) -> str:
+        parts = [f"server {state.get('server', 'unknown')}", f"Voicemeeter {state.get('voicemeeter', 'unknown')}"]
+        if state.get("errors") == "elevated":
+            parts.append(f"{state.get('window_errors')} errors in {state.get('window_seconds')} s")
+        return "IntegrateAgent: " + ", ".join(parts)
+
+    def _follow_status(self, session: requests.Session) -> None:
+        with session.get(STATUS_EVENTS_URL, stream=True, timeout=(1, STATUS_READ_TIMEOUT)) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines(decode_unicode=True):
+                if self._stop_event.is_set():
+                    return
+                if not line or not line.startswith("data:"):
+                    continue
+                state = json.loads(line[5:])
+                self._show_status(bool(state.get("healthy")), self._status_title(state))
+
+    def _watch_status(self) -> None:
+        delay = STATUS_RETRY_MIN
+        with requests.Session() as session:
+            while not self._stop_event.is_set():
+                try:
+                    self._follow_status(session)
+                    delay = STATUS_RETRY_MIN
+                except Exception:
+                    pass
+                self._show_status(False, "IntegrateAgent: server not reachable")
+                self._stop_event.wait(delay)
+                delay = min(STATUS_RETRY_MAX, delay * 2)
 
     def run(self) -> None:
         # Keep tray startup behavior aligned with scripts/run_server.cmd:
         # launching the tray should also bring up the API server.
         self.start_server()
-        threading.Thread(target=self._poll_health, daemon=True).start()
+        threading.Thread(target=self._watch_status, daemon=True).start()
         self.icon.run()
 
 